@@ -1,26 +1,54 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, jsonify, request, stream_with_context
 from flask_cors import CORS, cross_origin
-import requests
+from requests.utils import quote
 from bs4 import BeautifulSoup
 import numpy as np
-import random
 import re
 import os
 import json
+import threading
+import time
+import click
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from instrumentation import metrics, setup_logging
+from lotto_stats import LottoStatsEngine, latest_drawn_round, draw_time_of_round, next_draw_time, cross_check, KST
+from sampling import (GROUP_RANGES, MAX_SEED, check_group_size, generate_ticket_batch, parse_group_keys, request_rng,
+                      thread_rng)
+from pattern_index import EQUIVALENCES as PATTERN_EQUIVALENCES, MAX_ORDER as MAX_PATTERN_ORDER, PatternTransitionIndex
+from number_stats import NumberStatsIndex
+from cooccurrence import CooccurrenceIndex
+from combo_space import TOTAL as TOTAL_COMBINATIONS, ComboSpace
+from wheel import WheelBuilder, coverage
+from upstream import UpstreamUnavailable, breaker_states, http_get
+from draw_store import DrawStore
+from refresh import REFRESH_DELAY, RefreshScheduler, due_round
+from prize_checker import PRIZE_KEYS, count_prizes, encode_draws, encode_tickets
+from qr_parser import QRParseError, QRResultCache, parse_qr_html, qr_cache_key
 
 app = Flask(__name__)
+logger = setup_logging()
 CORS(app, resources={r"/api/*": {"origins": "*"}}, methods=["GET", "POST", "OPTIONS"])
 
-HISTORICAL_FILE = "historical_data.json"  # 미리 업로드된 백본 JSON 파일
+HISTORICAL_FILE = "historical_data.json"  # 미리 업로드된 백본 JSON 파일 (저장소 최초 생성 시 가져옴)
+EXPORT_FILE = "historical_data.export.json"  # export-json 기본 출력 경로 (백본 파일을 덮어쓰지 않도록 분리)
+DRAW_STORE_FILE = os.environ.get("DRAW_STORE_FILE", "historical_data.bin")  # 추가 전용 바이너리 저장소
+MAX_BATCH_COUNT = 100000  # /api/numbers/batch 1회 요청 최대 티켓 수
+BACKFILL_WORKERS = int(os.environ.get("BACKFILL_WORKERS", "8"))  # 회차 병렬 수집 동시성
+REFRESH_LOCK_FILE = os.environ.get("REFRESH_LOCK_FILE", DRAW_STORE_FILE + ".refresh.lock")  # 워커 간 단일 갱신 잠금
+REFRESH_SCHEDULER = os.environ.get("REFRESH_SCHEDULER", "1") == "1"  # 백그라운드 갱신 사용 여부
+WARM_COMBO_SPACE = os.environ.get("WARM_COMBO_SPACE", "1") == "1"  # 워밍업 시 전체 조합 비트셋(약 30MB)까지 구성
 
 # -----------------------------
 # 1) 공통 유틸 함수들
 # -----------------------------
 def fetch_lotto_probability():
+    """cross-check 명령 전용: statByNumber 페이지의 번호별 당첨 횟수 (실패 시 예외, 이전 응답으로 대체하지 않음)"""
     url = "https://dhlottery.co.kr/gameResult.do?method=statByNumber"
-    response = requests.get(url)
-    response.raise_for_status()
-    soup = BeautifulSoup(response.text, 'html.parser')
+    response = http_get(url)
+    with metrics.timer("html_parse"):
+        soup = BeautifulSoup(response.text, 'html.parser')
     
     probability_data = {}
     rows = soup.select("table.tbl_data tbody tr")
@@ -32,54 +60,28 @@ def fetch_lotto_probability():
             probability_data[number] = int(winning_count)
     return probability_data
 
-def fetch_lotto_winningNumber():
-    url = "https://dhlottery.co.kr/gameResult.do?method=byWin&wiselog=C_A_1_2"
-    response = requests.get(url)
-    response.raise_for_status()
-    soup = BeautifulSoup(response.text, 'html.parser')
-    
-    current_play = {}
-    draw_number = soup.find('h4').get_text(strip=True)
-    match = re.search(r'\d+', draw_number)
-    if match:
-        current_play['draw'] = int(match.group())
-    
-    winning_number = {}
-    number_tags = soup.select('.ball_645')
-    winning_numbers = [int(tag.get_text()) for tag in number_tags]
-    if len(winning_numbers) >= 6:
-        winning_number['numbers'] = winning_numbers[:6]
-        winning_number['bonus'] = winning_numbers[6]
-    
-    return {
-        "current_play": current_play,
-        "winning_number": winning_number
-    }
-
-def calculate_current_round(probability_data):
-    total_winning_count = sum(probability_data.values())
-    current_round = total_winning_count // 7
-    print("현재 로또 회차(추정):", current_round)
-    return current_round
+# 가중치(weights)는 번호를 인덱스로 하는 배열로, 통계 엔진이 방법별로 미리 계산해 둔 값을 사용합니다.
+# rng를 주지 않으면 현재 스레드 전용 스트림을 사용합니다. (전역 np.random/random 상태 미사용)
+def _weighted_choice(weights, available_numbers, n, rng):
+    candidates = np.asarray(available_numbers, dtype=np.intp)
+    candidate_weights = weights[candidates]
+    total = candidate_weights.sum()
+    p = candidate_weights / total if total > 0 else None
+    return rng.choice(candidates, size=n, p=p, replace=False).tolist()
 
-def calculate_probabilities(probability_data, current_round):
-    probabilities = {}
-    for number, count in probability_data.items():
-        probabilities[number] = (count / current_round) / 7
-    return probabilities
+def weighted_random_selection(weights, available_numbers, n=6, rng=None):
+    return _weighted_choice(weights, available_numbers, n, rng or thread_rng())
 
-def weighted_random_selection(probabilities, available_numbers, n=6):
-    weights = [probabilities[num] for num in available_numbers]
-    selected_numbers = np.random.choice(available_numbers, size=n, p=weights/np.sum(weights), replace=False)
-    return selected_numbers.tolist()
+def random_selection(available_numbers, n=6, rng=None):
+    return (rng or thread_rng()).choice(available_numbers, size=n, replace=False).tolist()
 
-def random_selection(available_numbers, n=6):
-    return random.sample(available_numbers, n)
+def inverse_weighted_selection(inverse_weights, available_numbers, n=6, rng=None):
+    return _weighted_choice(inverse_weights, available_numbers, n, rng or thread_rng())
 
-def inverse_weighted_selection(probabilities, available_numbers, n=6):
-    inverse_weights = [1/probabilities[num] if probabilities[num] > 0 else 0 for num in available_numbers]
-    selected_numbers = np.random.choice(available_numbers, size=n, p=inverse_weights/np.sum(inverse_weights), replace=False)
-    return selected_numbers.tolist()
+def conditional_selection(weights, available_numbers, chosen_numbers, cooccurrence, rng=None):
+    """이미 고른 번호와 함께 나온 횟수(쌍/삼중 조합)를 곱한 조건부 가중치로 번호 1개를 뽑습니다."""
+    scores = cooccurrence.conditional_scores(chosen_numbers)
+    return _weighted_choice(weights * scores, available_numbers, 1, rng or thread_rng())[0]
 
 def get_group_pattern(winning_numbers):
     """
@@ -108,77 +110,190 @@ def get_group_pattern(winning_numbers):
             pattern.append(0)
     return pattern
 
+_draw_store = None
+_stats_engine = None
+_pattern_index = None
+_number_stats = None
+_cooccurrence = None
+_combo_space = None
+_store_lock = threading.Lock()
+_index_lock = threading.Lock()
+_combo_lock = threading.Lock()
+
+def get_draw_store():
+    """
+    회차 저장소를 반환합니다. 저장소 파일이 없으면 historical_data.json을 가져와 생성합니다.
+    """
+    global _draw_store
+    if _draw_store is None:
+        with _store_lock:
+            if _draw_store is None:
+                store = DrawStore(DRAW_STORE_FILE)
+                if not store.exists() and os.path.exists(HISTORICAL_FILE):
+                    imported = store.import_json(HISTORICAL_FILE)
+                    logger.info("%s에서 %d개 회차를 저장소로 가져옴.", HISTORICAL_FILE, len(imported))
+                _draw_store = store
+    return _draw_store
+
+def load_historical_file():
+    store = get_draw_store()
+    if not store.exists():
+        return []
+    with metrics.timer("store_load"):
+        return store.records()
+
+def _ensure_indexes():
+    """
+    저장소를 한 번만 읽어 통계 엔진과 패턴 전이 인덱스를 구성합니다.
+    이후 update_historical_data()가 apply_new_rounds()로 새 회차를 증분 반영합니다.
+    """
+    if _stats_engine is None:
+        with _index_lock:
+            if _stats_engine is None:
+                _build_indexes(load_historical_file())
+
+def _build_indexes(historical_data):
+    """전체 회차로 인덱스를 새로 만들어 교체합니다. (요청 스레드는 교체 전 인덱스를 계속 사용)"""
+    global _stats_engine, _pattern_index, _number_stats, _cooccurrence
+    with metrics.timer("index_build"):
+        pattern_index = PatternTransitionIndex(get_group_pattern).load(historical_data)
+        number_stats = NumberStatsIndex(get_group_pattern).load(historical_data)
+        cooccurrence = CooccurrenceIndex().load(historical_data)
+        engine = LottoStatsEngine().load(historical_data)
+    _pattern_index, _number_stats, _cooccurrence = pattern_index, number_stats, cooccurrence
+    _stats_engine = engine
+
+def get_stats_engine():
+    _ensure_indexes()
+    return _stats_engine
+
+def get_pattern_index():
+    _ensure_indexes()
+    return _pattern_index
+
+def get_number_stats():
+    _ensure_indexes()
+    return _number_stats
+
+def get_cooccurrence():
+    _ensure_indexes()
+    return _cooccurrence
+
+def get_combo_space():
+    """전체 조합 조건 비트셋 (약 30MB, 최초 사용 시 한 번 구성)"""
+    global _combo_space
+    if _combo_space is None:
+        with _combo_lock:
+            if _combo_space is None:
+                historical_data = load_historical_file()
+                with metrics.timer("combo_space_build"):
+                    _combo_space = ComboSpace().load_winners(historical_data)
+    return _combo_space
+
+def apply_new_rounds(new_data):
+    """새로 추가된 회차들을 메모리 인덱스에 반영합니다."""
+    engine = get_stats_engine()
+    pattern_index = get_pattern_index()
+    number_stats = get_number_stats()
+    cooccurrence = get_cooccurrence()
+    for item in sorted(new_data, key=lambda x: x["round"]):
+        engine.append_round(item["round"], item["winning_numbers"], item.get("bonus"))
+        pattern_index.append_round(item["round"], item["winning_numbers"])
+        number_stats.append_round(item["round"], item["winning_numbers"])
+        cooccurrence.append_round(item["round"], item["winning_numbers"])
+        if _combo_space is not None:
+            _combo_space.add_winner(item["winning_numbers"])
+
+def sync_indexes_from_store(historical_data):
+    """
+    다른 워커(또는 backfill 명령)가 저장소에 추가한 회차를 메모리 인덱스에 반영합니다.
+    최신 회차 뒤에 붙은 회차만 있으면 증분 반영하고, 과거 회차가 채워졌으면(백필) 인덱스를 다시 만듭니다.
+    """
+    engine = get_stats_engine()
+    new_data = [item for item in historical_data if item["round"] > engine.last_round]
+    if engine.rounds + len(new_data) == len(historical_data):
+        if new_data:
+            apply_new_rounds(new_data)
+        return
+    logger.info("과거 회차가 추가되어 인덱스를 다시 구성합니다. (%d -> %d회차)", engine.rounds, len(historical_data))
+    with _index_lock:
+        _build_indexes(historical_data)
+    if _combo_space is not None:
+        _combo_space.load_winners(historical_data)
+
 # -----------------------------
-# 2) 번호 추첨 함수 (기존 그대로)
+# 2) 번호 추첨 함수 (method 4: 동시 출현 조건부 가중)
 # -----------------------------
-def select_numbers_from_groups(selected_groups, probabilities, method_choice, n=6):
-    group_ranges = {
-        '[1, 10]': list(range(1, 11)),
-        '[11, 20]': list(range(11, 21)),
-        '[21, 30]': list(range(21, 31)),
-        '[31, 40]': list(range(31, 41)),
-        '[41, 45]': list(range(41, 46))
-    }
+def select_numbers_from_groups(selected_groups, weights, method_choice, n=6, cooccurrence=None, rng=None):
+    """weights: method_choice의 번호별 가중치 (LottoStatsEngine.method_weights())"""
+    rng = rng or thread_rng()
+    if method_choice == 4 and cooccurrence is None:
+        cooccurrence = get_cooccurrence()
+    # 중복 및 정의되지 않은 그룹은 무시 (형식 오류, n개 미만 번호군은 ValueError)
+    group_keys = parse_group_keys(selected_groups)
+    check_group_size(group_keys, n)
 
     available_numbers = []
-    for group in selected_groups:
-        group_str = f"[{group[0]}, {group[1]}]"
-        if group_str in group_ranges:
-            available_numbers.extend(group_ranges[group_str])
-        else:
-            print(f"그룹 {group_str}이 group_ranges에 없습니다.")
-    print("가능한 번호(available_numbers):", available_numbers)
+    for key in group_keys:
+        available_numbers.extend(GROUP_RANGES[key])
+    logger.debug("가능한 번호(available_numbers): %s", available_numbers)
 
     mandatory_numbers = []
-    for group in selected_groups:
-        group_str = f"[{group[0]}, {group[1]}]"
-        current_group_numbers = group_ranges.get(group_str, [])
-        print(f"{group_str} 그룹 번호:", current_group_numbers)
+    for key in group_keys:
+        current_group_numbers = list(GROUP_RANGES[key])
+        logger.debug("%s 그룹 번호: %s", key, current_group_numbers)
         
         if method_choice == 1:
-            mandatory_numbers.append(weighted_random_selection(probabilities, current_group_numbers, 1)[0])
+            mandatory_numbers.append(weighted_random_selection(weights, current_group_numbers, 1, rng)[0])
         elif method_choice == 2:
-            mandatory_numbers.append(random_selection(current_group_numbers, 1)[0])
+            mandatory_numbers.append(random_selection(current_group_numbers, 1, rng)[0])
+        elif method_choice == 4:
+            mandatory_numbers.append(
+                conditional_selection(weights, current_group_numbers, mandatory_numbers, cooccurrence, rng))
         else:
-            mandatory_numbers.append(inverse_weighted_selection(probabilities, current_group_numbers, 1)[0])
-    print("필수 포함 번호(mandatory_numbers):", mandatory_numbers)
+            mandatory_numbers.append(inverse_weighted_selection(weights, current_group_numbers, 1, rng)[0])
+    logger.debug("필수 포함 번호(mandatory_numbers): %s", mandatory_numbers)
 
     chosen_numbers = mandatory_numbers.copy()
-    print("초기 선택된 번호(chosen_numbers):", chosen_numbers)
+    logger.debug("초기 선택된 번호(chosen_numbers): %s", chosen_numbers)
 
     while len(chosen_numbers) < n:
-        remaining_numbers = list(set(available_numbers) - set(chosen_numbers))
-        print("남은 번호(remaining_numbers):", remaining_numbers)
+        # 같은 seed로 같은 결과가 나오도록 후보 순서를 고정
+        remaining_numbers = sorted(set(available_numbers) - set(chosen_numbers))
+        logger.debug("남은 번호(remaining_numbers): %s", remaining_numbers)
 
         if not remaining_numbers:
-            print("남은 번호가 없습니다.")
+            logger.debug("남은 번호가 없습니다.")
             break
 
-        print(f"추출 방법(method_choice): {method_choice}")
+        logger.debug("추출 방법(method_choice): %s", method_choice)
 
         needed = n - len(chosen_numbers)
         if method_choice == 1:
-            new_numbers = weighted_random_selection(probabilities, remaining_numbers, needed)
+            new_numbers = weighted_random_selection(weights, remaining_numbers, needed, rng)
         elif method_choice == 2:
-            new_numbers = random_selection(remaining_numbers, needed)
+            new_numbers = random_selection(remaining_numbers, needed, rng)
+        elif method_choice == 4:
+            # 한 번호를 고를 때마다 조건부 가중치가 바뀌므로 1개씩 추출
+            new_numbers = [conditional_selection(weights, remaining_numbers, chosen_numbers, cooccurrence, rng)]
         else:
-            new_numbers = inverse_weighted_selection(probabilities, remaining_numbers, needed)
+            new_numbers = inverse_weighted_selection(weights, remaining_numbers, needed, rng)
 
         chosen_numbers.extend(new_numbers)
-        print("현재 선택된 번호(chosen_numbers):", chosen_numbers)
+        logger.debug("현재 선택된 번호(chosen_numbers): %s", chosen_numbers)
 
     return list(set(chosen_numbers))
 
 def fetch_lotto_numbers_by_round(round_num):
-    print(f"[DEBUG] fetch_lotto_numbers_by_round({round_num}) 호출됨.")
+    logger.debug("fetch_lotto_numbers_by_round(%s) 호출됨.", round_num)
     url = f"https://www.dhlottery.co.kr/gameResult.do?method=byWin&drwNo={round_num}"
     try:
-        response = requests.get(url)
-        response.raise_for_status()
+        response = http_get(url)
     except Exception as e:
-        print(f"[ERROR] 회차 {round_num} 데이터 요청 실패: {e}")
+        logger.error("회차 %s 데이터 요청 실패: %s", round_num, e)
         return {}
-    soup = BeautifulSoup(response.text, 'html.parser')
+    with metrics.timer("html_parse"):
+        soup = BeautifulSoup(response.text, 'html.parser')
     data = {}
     
     draw_info = soup.find('h4')
@@ -187,7 +302,7 @@ def fetch_lotto_numbers_by_round(round_num):
         if match:
             data['round'] = int(match.group())
     else:
-        print(f"[WARN] 회차 정보 없음 (round: {round_num})")
+        logger.warning("회차 정보 없음 (round: %s)", round_num)
     
     number_tags = soup.select('.ball_645')
     if number_tags:
@@ -197,136 +312,297 @@ def fetch_lotto_numbers_by_round(round_num):
                 data['winning_numbers'] = winning_numbers[:6]
                 data['bonus'] = winning_numbers[6] if len(winning_numbers) > 6 else None
             else:
-                print(f"[WARN] 회차 {round_num} 당첨 번호 부족: {winning_numbers}")
+                logger.warning("회차 %s 당첨 번호 부족: %s", round_num, winning_numbers)
         except Exception as e:
-            print(f"[ERROR] 회차 {round_num} 당첨 번호 파싱 실패: {e}")
+            logger.error("회차 %s 당첨 번호 파싱 실패: %s", round_num, e)
     else:
-        print(f"[WARN] 회차 {round_num} 당첨 번호 요소 없음.")
+        logger.warning("회차 %s 당첨 번호 요소 없음.", round_num)
     
-    print(f"[DEBUG] fetch_lotto_numbers_by_round({round_num}) 결과: {data}")
+    logger.debug("fetch_lotto_numbers_by_round(%s) 결과: %s", round_num, data)
     return data
 
+_snapshot = None
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def _build_snapshot(historical_data):
+    latest = historical_data[-1] if historical_data else None
+    return {
+        "round": latest["round"] if latest else 0,
+        "winning_numbers": latest["winning_numbers"] if latest else [],
+        "bonus": latest.get("bonus") if latest else None,
+        "version": len(historical_data),  # 저장된 회차 수 (과거 회차 백필 시에도 바뀜)
+        "updated_at": time.time()
+    }
+
+def sync_snapshot(refreshed=False):
+    """
+    저장소만 읽어 인덱스와 스냅샷을 갱신합니다. (업스트림 호출 없음)
+    updated_at(스냅샷 경과 시간의 기준)은 최신 회차나 버전이 바뀌었거나 업스트림 갱신이 성공했을 때만 바뀌며,
+    주기적인 저장소 재확인만으로는 초기화되지 않습니다. 처음 구성할 때는 저장소 파일의 수정 시각을 씁니다.
+    """
+    global _snapshot
+    historical_data = load_historical_file()
+    sync_indexes_from_store(historical_data)
+    snapshot = _build_snapshot(historical_data)
+    if _snapshot is None:
+        store = get_draw_store()
+        if store.exists():
+            snapshot["updated_at"] = min(os.path.getmtime(store.path), snapshot["updated_at"])
+        _snapshot = snapshot
+    elif refreshed or (snapshot["round"], snapshot["version"]) != (_snapshot["round"], _snapshot["version"]):
+        _snapshot = snapshot
+    return _snapshot["round"]
+
+def refresh_snapshot():
+    """업스트림에서 새 회차를 수집한 뒤 스냅샷을 갱신합니다."""
+    update_historical_data()
+    # 발표된 최신 회차까지 모두 받았으면 새 회차가 없어도 갱신 성공으로 봅니다.
+    return sync_snapshot(refreshed=get_draw_store().max_round() >= latest_drawn_round())
+
+def get_snapshot():
+    """요청 처리에서 사용하는 메모리 스냅샷. 최초 호출 시 저장소에서 구성합니다."""
+    if _snapshot is None:
+        sync_snapshot()
+    return _snapshot
+
+def snapshot_age():
+    return round(time.time() - get_snapshot()["updated_at"], 1)
+
+def snapshot_stale():
+    """
+    추첨 후 REFRESH_DELAY가 지났는데 아직 그 회차를 받지 못했으면 True.
+    업스트림 장애 중에는 마지막 정상 회차를 stale로 표시해 응답하고, 백그라운드 갱신이 계속 재시도합니다.
+    """
+    return get_snapshot()["round"] < due_round()
+
+def ensure_scheduler_started():
+    """워커마다 첫 요청 시 백그라운드 갱신을 시작합니다. (fork 이후 스레드 생성)"""
+    global _scheduler
+    if _scheduler is None and REFRESH_SCHEDULER:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = RefreshScheduler(refresh_snapshot, sync_snapshot, REFRESH_LOCK_FILE)
+                _scheduler.start()
+
+_warm_state = {"ready": False, "preloaded": False, "startup_seconds": None, "error": None}
+_warm_lock = threading.Lock()
+
+def validate_historical_data(historical_data):
+    """저장소 회차의 번호 형식(1~45, 중복 없음, 보너스 번호 포함 여부)을 검사해 문제 목록을 반환합니다."""
+    problems = []
+    for item in historical_data:
+        numbers = item["winning_numbers"]
+        bonus = item.get("bonus")
+        if len(numbers) != 6 or len(set(numbers)) != 6 or not all(1 <= n <= 45 for n in numbers):
+            problems.append(f"{item['round']}회 당첨 번호 오류: {numbers}")
+        elif bonus is not None and (not 1 <= bonus <= 45 or bonus in numbers):
+            problems.append(f"{item['round']}회 보너스 번호 오류: {bonus}")
+    return problems
+
+def warm_up(preloaded=False):
+    """
+    저장소 검증, 인덱스, 스냅샷(WARM_COMBO_SPACE면 조합 비트셋까지)을 미리 구성합니다.
+    gunicorn preload 모드에서는 마스터가 fork 전에 한 번 호출하고, 워커는 이 상태를 copy-on-write로 공유합니다.
+    fork 전에 실행되므로 업스트림 호출과 스레드 생성은 하지 않습니다. (백그라운드 갱신은 워커 첫 요청 시 시작)
+    """
+    with _warm_lock:
+        if _warm_state["ready"]:
+            return _warm_state
+        started = time.perf_counter()
+        try:
+            with metrics.timer("warm_up"):
+                historical_data = load_historical_file()
+                if not historical_data:
+                    raise ValueError("역대 당첨 데이터가 없습니다. (저장소가 없거나 로드 실패)")
+                problems = validate_historical_data(historical_data)
+                if problems:
+                    raise ValueError(f"저장소 검증 실패 {len(problems)}건, 첫 항목: {problems[0]}")
+                _ensure_indexes()
+                sync_snapshot()
+                if WARM_COMBO_SPACE:
+                    get_combo_space()
+        except Exception as e:
+            _warm_state["error"] = str(e)
+            logger.error("워밍업 실패: %s", e)
+            raise
+        seconds = round(time.perf_counter() - started, 3)
+        metrics.set("lotto_startup_duration_seconds", seconds, {"mode": "preload" if preloaded else "worker"})
+        _warm_state.update(ready=True, preloaded=preloaded, startup_seconds=seconds, error=None)
+        logger.info("워밍업 완료: %d회차, %.3f초 (preload=%s)", _snapshot["round"], seconds, preloaded)
+        return _warm_state
+
+def _warm_up_in_background():
+    try:
+        warm_up()
+    except Exception:
+        pass  # 오류는 warm_up()이 기록하며, 다음 요청에서 다시 시도합니다.
+
+def ensure_warm_started():
+    """preload 없이 실행된 워커는 첫 요청 시 백그라운드로 워밍업합니다. (완료 전까지 /api/ready는 503)"""
+    if not _warm_state["ready"] and not _warm_lock.locked():
+        threading.Thread(target=_warm_up_in_background, name="warm-up", daemon=True).start()
+
+@app.before_request
+def _start_background_refresh():
+    ensure_warm_started()
+    ensure_scheduler_started()
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def _add_snapshot_age(response):
+    if request.path.startswith('/api/') and _snapshot is not None:
+        response.headers['X-Snapshot-Age'] = str(snapshot_age())
+    return response
+
+@app.after_request
+def _record_request_metrics(response):
+    started = g.get('request_started')
+    if started is not None and request.path.startswith('/api/'):
+        # 경로 대신 엔드포인트 이름을 라벨로 사용해 라벨 수를 고정
+        endpoint = request.endpoint or 'unknown'
+        metrics.observe("lotto_http_request_duration_seconds", time.perf_counter() - started, {"endpoint": endpoint})
+        metrics.inc("lotto_http_requests_total", {"endpoint": endpoint, "status": str(response.status_code)})
+    return response
+
 # -----------------------------
 # 3) 증분 업데이트 로직 (백본 JSON 활용)
 # -----------------------------
 def update_historical_data():
-    print("[DEBUG] update_historical_data() 호출됨.")
-    if not os.path.exists(HISTORICAL_FILE):
-        print("[ERROR] 백본 데이터 파일(historical_data.json)이 없습니다. 먼저 업로드하세요.")
+    """
+    추첨일 기준 최신 회차까지 누락된 회차를 수집해 저장소와 인덱스에 반영합니다.
+    백그라운드 갱신(RefreshScheduler)에서만 호출되며 요청 처리 경로에서는 호출하지 않습니다.
+    """
+    logger.debug("update_historical_data() 호출됨.")
+    historical_data = load_historical_file()
+    if not historical_data:
+        logger.error("회차 저장소와 백본 데이터 파일(historical_data.json)이 없습니다. 먼저 업로드하세요.")
         return []
+    logger.debug("저장소에서 %d 개의 회차 데이터를 로드함.", len(historical_data))
+    sync_indexes_from_store(historical_data)
     
-    try:
-        with open(HISTORICAL_FILE, "r") as f:
-            historical_data = json.load(f)
-        print(f"[DEBUG] 캐시 파일에서 {len(historical_data)} 개의 회차 데이터를 로드함.")
-    except Exception as e:
-        print(f"[ERROR] 캐시 파일 로드 실패: {e}")
-        return []
+    max_round = historical_data[-1]["round"]
+    target_round = latest_drawn_round()  # 추첨일 기준 발표된 최신 회차
+    logger.debug("캐시 최대 회차: %s, 업데이트 대상: %s ~ %s", max_round, max_round + 1, target_round)
     
-    try:
-        current_data = fetch_lotto_winningNumber()
-        current_round = current_data["current_play"]["draw"]
-        print(f"[DEBUG] 현재 회차: {current_round}")
-    except Exception as e:
-        print(f"[ERROR] 현재 회차 데이터 가져오기 실패: {e}")
-        return historical_data
+    missing_rounds = list(range(max_round + 1, target_round + 1))
+    new_data = fetch_rounds_concurrently(missing_rounds)
     
-    if len(historical_data) == 0:
-        max_round = 0
+    if new_data:
+        historical_data = save_new_rounds(new_data)
+        apply_new_rounds(new_data)
     else:
-        max_round = max(item["round"] for item in historical_data)
-    
-    target_round = current_round - 1  # 발표된 최신 회차
-    print(f"[DEBUG] 캐시 최대 회차: {max_round}, 업데이트 대상: {max_round+1} ~ {target_round}")
+        logger.debug("새로운 회차 데이터가 없습니다.")
     
+    return historical_data
+
+def fetch_rounds_concurrently(rounds, workers=None):
+    """
+    여러 회차를 공유 세션 풀과 제한된 스레드 풀로 병렬 수집합니다.
+    결과는 완료 순서와 관계없이 회차 순서대로 반환됩니다.
+    """
+    if not rounds:
+        return []
+    workers = max(1, min(workers or BACKFILL_WORKERS, len(rounds)))
     new_data = []
-    for r in range(max_round + 1, target_round + 1):
-        try:
-            data = fetch_lotto_numbers_by_round(r)
-            if "winning_numbers" in data and data["winning_numbers"]:
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for r, data in zip(rounds, executor.map(fetch_lotto_numbers_by_round, rounds)):
+            if data.get("round") != r:
+                # 아직 발표되지 않은 회차는 최신 회차 페이지가 내려옴
+                logger.info("회차 %s 미발표 (응답 회차: %s)", r, data.get('round'))
+            elif "winning_numbers" in data and data["winning_numbers"]:
                 new_data.append({
                     "round": r,
-                    "winning_numbers": data["winning_numbers"]
-                    # "bonus": data.get("bonus")  # 필요시 추가
+                    "winning_numbers": data["winning_numbers"],
+                    "bonus": data.get("bonus")
                 })
-                print(f"[DEBUG] 회차 {r} -> {data['winning_numbers']}")
+                logger.debug("회차 %s -> %s", r, data['winning_numbers'])
             else:
-                print(f"[WARN] 회차 {r} 데이터가 없거나 빈 값.")
-        except Exception as e:
-            print(f"[ERROR] 회차 {r} 업데이트 실패: {e}")
-    
-    if new_data:
-        historical_data.extend(new_data)
-        historical_data = sorted(historical_data, key=lambda x: x["round"])
-        try:
-            with open(HISTORICAL_FILE, "w") as f:
-                json.dump(historical_data, f)
-            print(f"[DEBUG] {len(new_data)}개 회차 데이터를 캐시에 저장했습니다.")
-        except Exception as e:
-            print(f"[ERROR] 캐시 파일 저장 실패: {e}")
-    else:
-        print("[DEBUG] 새로운 회차 데이터가 없습니다.")
-    
-    return historical_data
+                logger.warning("회차 %s 데이터가 없거나 빈 값.", r)
+    return new_data
+
+def save_new_rounds(new_data):
+    """새 회차를 저장소에 추가하고 전체 회차 목록을 반환합니다. (기존 회차는 덮어쓰지 않음)"""
+    store = get_draw_store()
+    try:
+        with metrics.timer("store_save"):
+            written = store.append(new_data)
+        logger.info("%d개 회차 데이터를 저장소에 추가했습니다.", len(written))
+    except Exception as e:
+        logger.error("저장소 추가 실패: %s", e)
+    return store.records()
 
 # -----------------------------
 # 4) 추천 번호 로직 (번호군 패턴 비교)
 # -----------------------------
-def get_recommended_numbers():
+def get_recommendation(k=3, order=1, equivalence="multiset", window=None, min_support=1):
     """
-    1) update_historical_data()로 최신 데이터 확보
-    2) 최신 회차 당첨 번호의 번호군 패턴을 추출하고,
-       과거 회차 중 동일한 번호군 패턴을 가진 회차의 다음 회차 번호군 패턴을 후보로 수집
-    3) 후보가 없으면 빈 리스트, 있으면 빈도 순 상위 3개 반환
+    1) 백그라운드 갱신이 유지하는 메모리 스냅샷에서 최신 회차 확인
+    2) 최신 회차까지 최근 order개 회차의 번호군 패턴 이력을 만들고,
+       패턴 n-gram 인덱스에서 같은 이력(equivalence 동치) 다음 회차의 패턴 후보를 조회
+    3) 표본 수가 min_support보다 적으면 낮은 차수로 대체하며(차수 0 = 전체 패턴 분포),
+       빈도 순 상위 k개를 횟수(count)/표본 수(support)/사용한 차수(order)와 함께 반환
     """
-    print("[DEBUG] get_recommended_numbers() 호출됨.")
-    historical_data = update_historical_data()
-    if not historical_data:
-        raise Exception("역대 당첨 데이터가 없습니다. (캐시 파일이 없거나 로드 실패)")
+    logger.debug("get_recommendation() 호출됨.")
+    snapshot = get_snapshot()
+    previous_round = snapshot["round"]
+    previous_winning = snapshot["winning_numbers"]
+    logger.debug("최신 회차: %s", previous_round)
     
-    data_dict = {item['round']: item['winning_numbers'] for item in historical_data}
-    
-    current_data = fetch_lotto_winningNumber()
-    current_round = current_data["current_play"]["draw"]
-    previous_round = current_round - 1
-    print(f"[DEBUG] 현재 회차: {current_round}, 직전 회차: {previous_round}")
-
-    previous_winning = data_dict.get(previous_round)
     if not previous_winning:
-        print(f"[WARN] 캐시에서 직전 회차 {previous_round}가 없음, 개별 조회 시도")
-        prev_data = fetch_lotto_numbers_by_round(previous_round)
-        previous_winning = prev_data.get("winning_numbers", [])
-    
-    if not previous_winning:
-        raise Exception("직전 회차 당첨번호를 가져올 수 없습니다.")
+        raise Exception("역대 당첨 데이터가 없습니다. (저장소가 없거나 로드 실패)")
     
     # 최신(직전) 회차의 번호군 패턴 계산
     previous_pattern = get_group_pattern(previous_winning)
-    print(f"[DEBUG] 직전 회차 당첨 번호: {previous_winning} -> 패턴: {previous_pattern}")
-
-    candidate_counts = {}
-    for r in data_dict:
-        if r < previous_round and (r + 1) in data_dict:
-            # 과거 회차 r의 번호군 패턴
-            past_pattern = get_group_pattern(data_dict[r])
-            if past_pattern == previous_pattern:
-                # 후보: (r+1) 회차의 번호군 패턴
-                candidate = tuple(get_group_pattern(data_dict[r + 1]))
-                candidate_counts[candidate] = candidate_counts.get(candidate, 0) + 1
-                print(f"[DEBUG] 회차 {r} (패턴: {past_pattern})와 일치 -> 다음 회차 {r+1}: {get_group_pattern(data_dict[r+1])}")
-    
-    if not candidate_counts:
-        print("[WARN] 일치하는 과거 회차를 찾지 못했습니다. 추천 번호군을 반환할 수 없습니다.")
-        return []
-    
-    sorted_candidates = sorted(candidate_counts.items(), key=lambda x: x[1], reverse=True)
-    recommended_candidates = [list(candidate) for candidate, _ in sorted_candidates[:3]]
-    print(f"[DEBUG] 최종 추천 번호군: {recommended_candidates}")
-    return recommended_candidates
+    logger.debug("직전 회차 당첨 번호: %s -> 패턴: %s", previous_winning, previous_pattern)
+
+    pattern_index = get_pattern_index()
+    history = pattern_index.history(previous_round, order) or [previous_pattern]
+    result = pattern_index.query(history, order=order, equivalence=equivalence, window=window,
+                                 min_support=min_support, k=k, latest_round=previous_round)
+    if not result["candidates"]:
+        logger.warning("일치하는 과거 회차를 찾지 못했습니다. 추천 번호군을 반환할 수 없습니다.")
+        return result
+    if result["order"] < order:
+        logger.debug("차수 %s 표본 부족으로 차수 %s 사용 (표본 %s)", order, result["order"], result["support"])
+    probability_array = get_stats_engine().probability_array()
+    cooccurrence = get_cooccurrence()
+    for candidate in result["candidates"]:
+        candidate["numbers"] = numbers_for_pattern(candidate["pattern"], probability_array, cooccurrence)
+    logger.debug("최종 추천 번호군: %s", result["candidates"])
+    return result
+
+PATTERN_GROUPS = dict(enumerate(GROUP_RANGES.values(), start=1))  # 패턴 값(1~5) -> 번호군 번호
+
+def numbers_for_pattern(pattern, probability_array, cooccurrence):
+    """
+    번호군 패턴을 구체적인 번호로 채웁니다. 각 칸마다 해당 번호군에서
+    (번호 확률 x 이미 고른 번호와의 동시 출현 점수)가 가장 큰 번호를 고릅니다. (같은 회차 안에서는 항상 같은 결과)
+    """
+    chosen = []
+    for group in pattern:
+        scores = probability_array * cooccurrence.conditional_scores(chosen)
+        candidates = [num for num in PATTERN_GROUPS.get(group, ()) if num not in chosen]
+        if not candidates:
+            continue
+        chosen.append(max(candidates, key=lambda num: (scores[num], -num)))
+    return sorted(chosen)
 
 # -----------------------------
 # 5) Flask API 라우트
 # -----------------------------
+def parse_seed(data):
+    """
+    요청의 seed(0 ~ MAX_SEED 정수)를 검사합니다. 없으면 None이며, 이 경우 request_rng()가 새 seed를 만듭니다.
+    같은 seed와 같은 회차(round)로 다시 요청하면 같은 번호가 나옵니다.
+    """
+    seed = data.get('seed')
+    if seed is None:
+        return None
+    if isinstance(seed, bool) or not isinstance(seed, int) or not 0 <= seed <= MAX_SEED:
+        raise ValueError(f"seed는 0 ~ {MAX_SEED} 사이의 정수여야 합니다.")
+    return seed
+
 @app.route('/api/numbers', methods=['POST', 'OPTIONS'])
 def get_numbers():
     if request.method == 'OPTIONS':
@@ -336,26 +612,252 @@ def get_numbers():
     selected_groups = data.get('selected_groups', [])
     method = data.get('method', 1)
     method_choice = method
-    print("선택된 method_choice:", method_choice)
+    logger.debug("선택된 method_choice: %s", method_choice)
+    if method_choice not in (1, 2, 3, 4):
+        return jsonify({"error": "method는 1, 2, 3, 4 중 하나여야 합니다."}), 400
+    try:
+        rng, seed = request_rng(parse_seed(data))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
-    probability_data = fetch_lotto_probability()
-    current_round = calculate_current_round(probability_data)
-    probabilities = calculate_probabilities(probability_data, current_round)
+    # statByNumber 스크래핑 대신 로컬 통계 엔진 사용 (방법별 가중치는 회차 반영 시 미리 계산됨)
+    engine = get_stats_engine()
+    # 뒤처짐 경고는 백그라운드 갱신이 회차마다 한 번 남기고, 응답에는 stale로 표시됩니다.
+    weights = engine.method_weights(method_choice)
     
-    numbers = select_numbers_from_groups(selected_groups, probabilities, method_choice, n=6)
+    try:
+        with metrics.timer("sampling"):
+            numbers = select_numbers_from_groups(selected_groups, weights, method_choice, n=6, rng=rng)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     numbers.sort()
-    print("서버에서 반환하는 번호:", numbers)
-    return jsonify({"numbers": numbers})
+    logger.debug("서버에서 반환하는 번호: %s", numbers)
+    return jsonify({"numbers": numbers, "seed": seed, "round": engine.last_round})
+
+@app.route('/api/numbers/batch', methods=['POST', 'OPTIONS'])
+def get_numbers_batch():
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    data = request.get_json() or {}
+    selected_groups = data.get('selected_groups', [])
+    method_choice = data.get('method', 1)
+    try:
+        count = int(data.get('count', 1))
+    except (TypeError, ValueError):
+        return jsonify({"error": "count는 정수여야 합니다."}), 400
+    if not 1 <= count <= MAX_BATCH_COUNT:
+        return jsonify({"error": f"count는 1 ~ {MAX_BATCH_COUNT} 사이여야 합니다."}), 400
+    if method_choice == 4:
+        return jsonify({"error": "조건부 가중(method 4)은 /api/numbers에서만 지원합니다."}), 400
+    if method_choice not in (1, 2, 3):
+        return jsonify({"error": "method는 1, 2, 3 중 하나여야 합니다."}), 400
+
+    engine = get_stats_engine()
+    started = time.perf_counter()
+    try:
+        rng, seed = request_rng(parse_seed(data))
+        with metrics.timer("sampling"):
+            tickets = generate_ticket_batch(selected_groups, engine.probability_array(), method_choice, count, n=6,
+                                            rng=rng, log_weights=engine.method_log_weights(method_choice))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    elapsed = time.perf_counter() - started
+
+    return jsonify({
+        "tickets": tickets.tolist(),
+        "count": count,
+        "seed": seed,
+        "round": engine.last_round,
+        "elapsed_ms": round(elapsed * 1000, 3),
+        "tickets_per_sec": round(count / elapsed, 1) if elapsed > 0 else None
+    })
+
+MAX_CONSTRAINED_COUNT = 1000  # /api/numbers/constrained 1회 요청 최대 티켓 수
+
+def parse_int_range(value, name):
+    """정수 하나 또는 [최소, 최대]를 (최소, 최대)로 변환합니다."""
+    try:
+        if isinstance(value, (list, tuple)) and len(value) == 2:
+            low, high = int(value[0]), int(value[1])
+        else:
+            low = high = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name}는 정수 또는 [최소, 최대]여야 합니다.")
+    if low > high:
+        raise ValueError(f"{name}의 최소값이 최대값보다 큽니다.")
+    return low, high
+
+@app.route('/api/numbers/constrained', methods=['POST', 'OPTIONS'])
+def get_constrained_numbers():
+    """
+    조건을 만족하는 조합 전체에서 티켓을 뽑습니다. (재시도 없이 유효 조합 수에 비례하는 시간)
+      sum_range: [최소, 최대] 합계          odd_count: 홀수 개수 또는 [최소, 최대]
+      max_run: 최대 연속 번호 길이           exclude_winners: 역대 당첨 조합 제외 (기본 true)
+      selected_groups: 번호군마다 1개 이상, 선택하지 않은 번호군 번호는 제외
+      method: 1(가중), 2(균등), 3(역가중)    count: 티켓 수
+      seed: 재현용 시드 (같은 seed, 같은 회차면 같은 티켓)
+    """
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    data = request.get_json() or {}
+    method_choice = data.get('method', 1)
+    try:
+        count = int(data.get('count', 1))
+        max_run = int(data['max_run']) if data.get('max_run') is not None else None
+    except (TypeError, ValueError):
+        return jsonify({"error": "count, max_run은 정수여야 합니다."}), 400
+    try:
+        sum_range = parse_int_range(data['sum_range'], 'sum_range') if data.get('sum_range') is not None else None
+        odd_range = parse_int_range(data['odd_count'], 'odd_count') if data.get('odd_count') is not None else None
+        group_keys = parse_group_keys(data['selected_groups']) if data.get('selected_groups') else None
+        rng, seed = request_rng(parse_seed(data))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if not 1 <= count <= MAX_CONSTRAINED_COUNT:
+        return jsonify({"error": f"count는 1 ~ {MAX_CONSTRAINED_COUNT} 사이여야 합니다."}), 400
+    if max_run is not None and max_run < 1:
+        return jsonify({"error": "max_run은 1 이상이어야 합니다."}), 400
+    if method_choice not in (1, 2, 3):
+        return jsonify({"error": "method는 1, 2, 3 중 하나여야 합니다."}), 400
+
+    groups = None
+    if group_keys is not None:
+        if not group_keys:
+            return jsonify({"error": "선택된 번호군이 없습니다."}), 400
+        groups = {list(GROUP_RANGES).index(key) for key in group_keys}
+
+    started = time.perf_counter()
+    space = get_combo_space()
+    mask = space.valid_mask(
+        sum_range=sum_range,
+        odd_counts=range(odd_range[0], odd_range[1] + 1) if odd_range else None,
+        max_run=max_run,
+        groups=groups,
+        exclude_winners=data.get('exclude_winners', True) is not False
+    )
+    engine = get_stats_engine()
+    log_weights = engine.method_log_weights(method_choice) if method_choice != 2 else None
+    with metrics.timer("sampling"):
+        tickets, valid_count = space.sample(mask, count, log_weights, rng)
+    if not valid_count:
+        return jsonify({"error": "조건을 만족하는 조합이 없습니다.", "valid_combinations": 0}), 400
+    elapsed = time.perf_counter() - started
+
+    return jsonify({
+        "tickets": tickets.tolist(),
+        "count": len(tickets),
+        "valid_combinations": valid_count,
+        "total_combinations": TOTAL_COMBINATIONS,
+        "seed": seed,
+        "round": engine.last_round,
+        "elapsed_ms": round(elapsed * 1000, 3)
+    })
+
+MAX_WHEEL_COUNT = 500  # /api/numbers/wheel 1회 요청 최대 티켓 수
+MAX_WHEEL_BUDGET_MS = 2000
+
+@app.route('/api/numbers/wheel', methods=['POST', 'OPTIONS'])
+def get_wheel_numbers():
+    """
+    공동 구매용 티켓 묶음: 선택한 번호군 안의 번호쌍(k=2) 또는 삼중 조합(k=3)을 최대한 많이 덮도록 구성합니다.
+      count: 티켓 수    k: 2 또는 3    time_budget_ms: 지역 탐색 시간 예산 (기본 200)
+    """
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    data = request.get_json() or {}
+    try:
+        count = int(data.get('count', 10))
+        k = int(data.get('k', 2))
+        budget_ms = float(data.get('time_budget_ms', 200))
+    except (TypeError, ValueError):
+        return jsonify({"error": "count, k, time_budget_ms는 숫자여야 합니다."}), 400
+    if not 1 <= count <= MAX_WHEEL_COUNT:
+        return jsonify({"error": f"count는 1 ~ {MAX_WHEEL_COUNT} 사이여야 합니다."}), 400
+    if k not in (2, 3):
+        return jsonify({"error": "k는 2 또는 3이어야 합니다."}), 400
+    budget_ms = max(0.0, min(budget_ms, MAX_WHEEL_BUDGET_MS))
+
+    try:
+        group_keys = parse_group_keys(data['selected_groups']) if data.get('selected_groups') else list(GROUP_RANGES)
+        check_group_size(group_keys)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    universe = sorted({num for key in group_keys for num in GROUP_RANGES[key]})
+
+    builder = WheelBuilder(universe, k, rng=thread_rng())
+    with metrics.timer("wheel_build"):
+        search = builder.build(count, budget_ms / 1000)
+    tickets = builder.ticket_list()
+    return jsonify({
+        "tickets": tickets,
+        "count": len(tickets),
+        "k": k,
+        "coverage": {"pairs": coverage(tickets, universe, 2), "triples": coverage(tickets, universe, 3)},
+        "search": search
+    })
+
+STALE_MAX_AGE = 60  # stale 응답은 갱신 재시도 주기에 맞춰 짧게 캐시
+
+def round_validators(extra=""):
+    """
+    회차 단위로 바뀌는 응답의 (ETag, Last-Modified, Expires).
+    ETag는 회차 번호와 데이터 버전(저장된 회차 수)으로 만들고, 다음 추첨 후 갱신 시각까지 캐시합니다.
+    """
+    snapshot = get_snapshot()
+    stale = snapshot_stale()
+    etag = f"{snapshot['round']}-{snapshot['version']}{extra}{'-stale' if stale else ''}"
+    last_modified = draw_time_of_round(snapshot['round'])
+    now = datetime.now(KST)
+    expires = now + timedelta(seconds=STALE_MAX_AGE) if stale else next_draw_time(now) + REFRESH_DELAY
+    return etag, last_modified, expires
+
+def is_not_modified(etag, last_modified):
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+def set_cache_headers(response, validators):
+    etag, last_modified, expires = validators
+    response.set_etag(etag, weak=True)
+    response.last_modified = last_modified
+    response.expires = expires
+    max_age = max(0, int((expires - datetime.now(KST)).total_seconds()))
+    response.headers['Cache-Control'] = f"public, max-age={max_age}, stale-while-revalidate={STALE_MAX_AGE}"
+    return response
+
+def not_modified_response(validators):
+    """조건부 요청이 최신이면 본문을 만들기 전에 304를 반환합니다. (아니면 None)"""
+    if is_not_modified(*validators[:2]):
+        return set_cache_headers(Response(status=304), validators)
+    return None
 
 @app.route('/api/lotto/current', methods=['GET'])
 def get_lotto_data():
     try:
-        data = fetch_lotto_winningNumber()
-        return jsonify({
-            'currentRound': data['current_play']['draw'],
-            'winningNumbers': data['winning_number']['numbers'],
-            'bonusNumber': data['winning_number']['bonus']
+        snapshot = get_snapshot()
+        if not snapshot['winning_numbers']:
+            raise Exception("역대 당첨 데이터가 없습니다. (저장소가 없거나 로드 실패)")
+        validators = round_validators()
+        cached = not_modified_response(validators)
+        if cached is not None:
+            return cached
+        stale = snapshot_stale()
+        response = jsonify({
+            'currentRound': snapshot['round'],
+            'winningNumbers': snapshot['winning_numbers'],
+            'bonusNumber': snapshot['bonus'],
+            'snapshotAge': snapshot_age(),
+            'stale': stale,
+            'upstream': breaker_states()
         })
+        if stale:
+            response.headers['Warning'] = '110 - "Response is Stale"'
+        return set_cache_headers(response, validators)
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
@@ -365,13 +867,199 @@ def recommend_numbers():
     if request.method == 'OPTIONS':
          return '', 200
     try:
-        recommended = get_recommended_numbers()
-        return jsonify({"recommended_numbers": recommended})
+        k = max(1, min(int(request.args.get('k', 3)), 20))
+        order = max(1, min(int(request.args.get('order', 1)), MAX_PATTERN_ORDER))
+        min_support = max(1, int(request.args.get('min_support', 1)))
+        window = int(request.args['window']) if request.args.get('window') else None
+    except ValueError:
+        return jsonify({"error": "k, order, min_support, window는 정수여야 합니다."}), 400
+    equivalence = request.args.get('equivalence', 'multiset')
+    if equivalence not in PATTERN_EQUIVALENCES:
+        return jsonify({"error": f"equivalence는 {', '.join(PATTERN_EQUIVALENCES)} 중 하나여야 합니다."}), 400
+    if window is not None and window < 1:
+        return jsonify({"error": "window는 1 이상이어야 합니다."}), 400
+    try:
+        validators = round_validators(f"-k{k}-o{order}-{equivalence}-w{window}-s{min_support}")
+        cached = not_modified_response(validators)
+        if cached is not None:
+            return cached
+        result = get_recommendation(k, order, equivalence, window, min_support)
+        candidates = result["candidates"]
+        return set_cache_headers(jsonify({
+            "recommended_numbers": [candidate["pattern"] for candidate in candidates],
+            "candidates": candidates,
+            "order": result["order"],
+            "support": result["support"],
+            "round": get_snapshot()["round"],
+            "snapshot_age": snapshot_age(),
+            "stale": snapshot_stale()
+        }), validators)
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
+@app.route('/api/stats', methods=['GET'])
+def number_stats():
+    """
+    번호 통계: 빈도, 핫/콜드 번호, 미출현 회차 수, 홀짝/합계/번호군 패턴 분포.
+    ?last=K (최근 K회) 또는 ?from_round=&to_round= 로 구간을 지정하고, ?top=N으로 핫/콜드 개수를 정합니다.
+    """
+    try:
+        last, from_round, to_round = (
+            int(request.args[name]) if request.args.get(name) else None
+            for name in ('last', 'from_round', 'to_round')
+        )
+        top = max(1, min(int(request.args.get('top', 6)), 45))
+    except ValueError:
+        return jsonify({"error": "last, from_round, to_round, top은 정수여야 합니다."}), 400
+    if last is not None and last < 1:
+        return jsonify({"error": "last는 1 이상이어야 합니다."}), 400
+
+    validators = round_validators(f"-stats-{last}-{from_round}-{to_round}-{top}")
+    cached = not_modified_response(validators)
+    if cached is not None:
+        return cached
+    stats = get_number_stats()
+    start, end = stats.window(from_round, to_round, last)
+    try:
+        summary = stats.summary(start, end, top)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    summary["round"] = stats.last_round
+    return set_cache_headers(jsonify(summary), validators)
+
+MAX_PAIR_TOP = 100
+
+@app.route('/api/stats/pairs', methods=['GET'])
+def pair_stats():
+    """
+    번호 동시 출현 통계: 상위 번호쌍/삼중 조합.
+    ?number=N 이면 N과 함께 나온 번호, ?last=K 이면 최근 K회, ?decay=1 이면 최근 가중 점수(반감기 COOCCURRENCE_HALF_LIFE회).
+    ?matrix=1 이면 45 x 45 쌍 행렬도 함께 반환합니다.
+    """
+    try:
+        number, last = (int(request.args[name]) if request.args.get(name) else None for name in ('number', 'last'))
+        top = max(1, min(int(request.args.get('top', 10)), MAX_PAIR_TOP))
+    except ValueError:
+        return jsonify({"error": "number, last, top은 정수여야 합니다."}), 400
+    decay = request.args.get('decay') == '1'
+    with_matrix = request.args.get('matrix') == '1'
+    if number is not None and not 1 <= number <= 45:
+        return jsonify({"error": "number는 1 ~ 45 사이여야 합니다."}), 400
+    if last is not None and last < 1:
+        return jsonify({"error": "last는 1 이상이어야 합니다."}), 400
+    if decay and last is not None:
+        return jsonify({"error": "last와 decay는 함께 사용할 수 없습니다."}), 400
+
+    validators = round_validators(f"-pairs-{number}-{last}-{int(decay)}-{top}-{int(with_matrix)}")
+    cached = not_modified_response(validators)
+    if cached is not None:
+        return cached
+    cooccurrence = get_cooccurrence()
+    result = {
+        "round": cooccurrence.last_round,
+        "rounds": min(last, cooccurrence.size) if last else cooccurrence.size,
+        "mode": "decay" if decay else "window" if last else "all",
+        "pairs": cooccurrence.top_pairs(top, number, last, decay),
+        "triples": cooccurrence.top_triples(top, number, last, decay),
+    }
+    if decay:
+        result["half_life"] = cooccurrence.half_life
+    if with_matrix:
+        matrix = cooccurrence.pair_matrix(last, decay)[1:, 1:]
+        result["matrix"] = np.round(matrix, 4).tolist() if decay else matrix.tolist()
+    return set_cache_headers(jsonify(result), validators)
+
+@app.route('/api/ready', methods=['GET'])
+def readiness():
+    """준비 상태: 워밍업(저장소 검증, 인덱스/스냅샷 구성)이 끝났으면 200, 아니면 503"""
+    state = dict(_warm_state, pid=os.getpid())
+    if not state["ready"]:
+        return jsonify(state), 503
+    state["round"] = _snapshot["round"]
+    return jsonify(state)
+
+@app.route('/api/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Prometheus 텍스트 형식 메트릭 (METRICS_DIR 설정 시 모든 gunicorn 워커 합산)"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 # -----------------------------
 # 6) QR 등록
 # -----------------------------
+QR_PREFIX_WINQR = "https://m.dhlottery.co.kr/qr.do?method=winQr&v="
+QR_PREFIX_SHORT = "http://m.dhlottery.co.kr/?v="
+QR_BULK_WORKERS = int(os.environ.get("QR_BULK_WORKERS", "8"))  # 일괄 QR 조회 동시성
+MAX_QR_BULK = 500  # /api/register-lotto/bulk 1회 요청 최대 QR 수
+# v= 파라미터별 파싱 결과 (저장소에 들어온 회차는 결과 확정으로 간주)
+qr_cache = QRResultCache(int(os.environ.get("QR_CACHE_SIZE", "2048")),
+                         is_published=lambda round_num: get_draw_store().get(round_num) is not None)
+
+class QRTicketError(Exception):
+    def __init__(self, message, status=400, **extra):
+        super().__init__(message)
+        self.status = status
+        self.extra = extra
+
+    def to_dict(self):
+        return {"error": str(self), **self.extra}
+
+def resolve_qr_url(url):
+    """
+    QR URL을 당첨 확인 페이지(winQr) URL로 변환합니다.
+    단축 형식(http://m.dhlottery.co.kr/?v=...)은 자바스크립트 리다이렉트 페이지를 거치지 않고
+    v= 파라미터로 바로 winQr URL을 구성합니다.
+    """
+    if not isinstance(url, str) or not url:
+        raise QRTicketError("URL이 전달되지 않았습니다.", 400)
+    if url.startswith(QR_PREFIX_WINQR):
+        return url
+    if url.startswith(QR_PREFIX_SHORT):
+        parts = url.split('?v=')
+        if len(parts) == 2 and parts[1]:
+            return QR_PREFIX_WINQR + quote(parts[1], safe='')
+        logger.warning("URL에서 '?v=' 파라미터 추출 실패")
+        raise QRTicketError("URL에서 '?v=' 파라미터를 추출할 수 없습니다.", 400)
+    logger.warning("URL 형식 오류: %s", url)
+    raise QRTicketError("유효하지 않은 QR 코드입니다.", 400)
+
+def fetch_qr_page(url):
+    new_url = resolve_qr_url(url)
+    try:
+        response = http_get(new_url)
+        logger.debug("QR 코드 페이지 요청 성공. 응답 길이: %d", len(response.text))
+    except UpstreamUnavailable as e:
+        logger.warning("QR 코드 페이지 요청 생략: %s", e)
+        raise QRTicketError("동행복권 서버 응답이 없어 잠시 후 다시 시도해 주세요.", 503, details=str(e))
+    except Exception as e:
+        logger.error("QR 코드 페이지 요청 실패: %s", e)
+        raise QRTicketError("QR 코드 페이지를 가져오는데 실패했습니다.", 500, details=str(e))
+    if "document.location.href" in response.text:
+        logger.error("winQr 페이지에서 다시 리다이렉트가 발생함: %s", new_url)
+        raise QRTicketError("리다이렉트 후 QR 코드 페이지를 가져오는데 실패했습니다.", 500)
+    return response.text
+
+def parse_qr_page(html):
+    try:
+        with metrics.timer("html_parse"):
+            result = parse_qr_html(html)
+    except QRParseError as e:
+        logger.warning("추출된 번호가 부족함: %s", e.extracted)
+        raise QRTicketError(str(e), 400, extracted=e.extracted)
+    logger.debug("당첨 번호: %s 보너스 번호: %s A~E 행: %d",
+                 result["registeredNumbers"], result["bonus"], len(result["rowData"]))
+    return result
+
+def verify_qr_ticket(url):
+    """같은 티켓(v= 파라미터)은 캐시된 파싱 결과를 사용합니다."""
+    key = qr_cache_key(url) if isinstance(url, str) else None
+    if key:
+        cached = qr_cache.get(key)
+        if cached is not None:
+            return cached
+    result = parse_qr_page(fetch_qr_page(url))
+    if key:
+        qr_cache.put(key, result)
+    return result
+
 @app.route('/api/register-lotto', methods=['POST', 'OPTIONS'])
 @cross_origin()
 def register_lotto():
@@ -380,153 +1068,174 @@ def register_lotto():
 
     data = request.get_json()
     url = data.get('url')
-    print("[DEBUG] Received URL:", url)
+    logger.debug("Received URL: %s", url)
     
     if not url:
-        print("[ERROR] URL이 전달되지 않음")
+        logger.warning("URL이 전달되지 않음")
         return jsonify({"error": "URL이 전달되지 않았습니다."}), 400
 
-    # 두 가지 형식을 허용
-    expected_prefix1 = "https://m.dhlottery.co.kr/qr.do?method=winQr&v="
-    expected_prefix2 = "http://m.dhlottery.co.kr/?v="
-    if not (url.startswith(expected_prefix1) or url.startswith(expected_prefix2)):
-        print("[ERROR] URL 형식 오류:", url)
-        return jsonify({"error": "유효하지 않은 QR 코드입니다."}), 400
-
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        print("[DEBUG] 첫 번째 QR 코드 페이지 요청 성공. 응답 길이:", len(response.text))
-        print("[DEBUG] Response text snippet:", response.text[:200])
-    except Exception as e:
-        print("[ERROR] 첫 번째 QR 코드 페이지 요청 실패:", e)
-        return jsonify({"error": "QR 코드 페이지를 가져오는데 실패했습니다.", "details": str(e)}), 500
+        return jsonify(verify_qr_ticket(url))
+    except QRTicketError as e:
+        return jsonify(e.to_dict()), e.status
 
-    # 자바스크립트 리다이렉트 코드가 있으면 새 URL로 재요청
-    if "document.location.href" in response.text:
-        parts = url.split('?v=')
-        if len(parts) == 2:
-            param = parts[1]
-            from requests.utils import quote
-            new_url = "https://m.dhlottery.co.kr/qr.do?method=winQr&v=" + quote(param, safe='')
-            print("[DEBUG] 리다이렉트 URL 구성됨:", new_url)
-            try:
-                response = requests.get(new_url)
-                response.raise_for_status()
-                print("[DEBUG] 리다이렉트 후 QR 코드 페이지 요청 성공. 응답 길이:", len(response.text))
-            except Exception as e:
-                print("[ERROR] 리다이렉트 후 QR 코드 페이지 요청 실패:", e)
-                return jsonify({"error": "리다이렉트 후 QR 코드 페이지를 가져오는데 실패했습니다.", "details": str(e)}), 500
-        else:
-            print("[ERROR] URL에서 '?v=' 파라미터 추출 실패")
-            return jsonify({"error": "URL에서 '?v=' 파라미터를 추출할 수 없습니다."}), 400
-
-    # HTML 파싱
-    soup = BeautifulSoup(response.text, 'html.parser')
-    numbers = []
-
-    # (1) 상단 당첨 번호 추출 (fallback: 모든 <span>)
-    span_elements = soup.find_all('span')
-    print("[DEBUG] span 태그 결과 개수 (fallback):", len(span_elements))
-    for elem in span_elements:
-        text = elem.get_text(strip=True)
-        if re.match(r'^\d{1,2}$', text):
-            try:
-                numbers.append(int(text))
-            except ValueError as ve:
-                print("[ERROR] 숫자 변환 실패:", ve)
-
-    print("[DEBUG] 추출된 번호 개수 (첫번째 시도):", len(numbers))
-    if len(numbers) < 6:
-        # 전체 텍스트에서 정규식으로 추가 검색
-        all_text = soup.get_text()
-        print("[DEBUG] 전체 페이지 텍스트 길이:", len(all_text))
-        numbers = [int(x) for x in re.findall(r'\b\d{1,2}\b', all_text)]
-        numbers = [n for n in numbers if 1 <= n <= 45]
-        print("[DEBUG] 추출된 번호 개수 (전체 텍스트 검색 후):", len(numbers))
-
-    if len(numbers) < 6:
-        print("[ERROR] 추출된 번호가 부족함:", numbers)
-        return jsonify({"error": "로또 번호를 추출할 수 없습니다.", "extracted": numbers}), 400
-
-    winning_numbers = numbers[:6]
-    bonus_number = numbers[6] if len(numbers) > 6 else None
-    print("[DEBUG] 최종 당첨 번호:", winning_numbers, "보너스 번호:", bonus_number)
-
-    # (2) A~E 행 데이터 추출
-    #  - 예: 
-    #    <tr>
-    #      <th scope="row">A</th>
-    #      <td class="result">낙첨</td>
-    #      <td>
-    #        <span class="clr">3</span>
-    #        <span class="clr">9</span>
-    #        ...
-    #      </td>
-    #    </tr>
-    rows_data = []
-
-    # tbl_basic 테이블이 확실하다면 아래처럼:
-    # table = soup.find("table", class_="tbl_basic")
-    # if not table:
-    #   ...
-    #   return ...
-    # all_tr = table.find_all("tr")
-
-    # 또는 전체 tr 중에서 <th scope="row">가 A/B/C/D/E 인 행 찾기
-    all_tr = soup.find_all("tr")
-    print("[DEBUG] 전체 tr 개수:", len(all_tr))
-
-    for tr in all_tr:
-        # <th scope="row">A</th>
-        th = tr.find("th", {"scope": "row"})
-        if not th:
-            continue
+@app.route('/api/register-lotto/bulk', methods=['POST', 'OPTIONS'])
+@cross_origin()
+def register_lotto_bulk():
+    """
+    여러 QR URL을 공유 세션으로 병렬 조회하고, 완료되는 순서대로 티켓별 결과를 NDJSON 한 줄씩 내려줍니다.
+    각 줄에는 요청 목록에서의 위치(index)와 url이 포함됩니다.
+    """
+    if request.method == 'OPTIONS':
+        return '', 200
 
-        label = th.get_text(strip=True)
-        if label not in ["A", "B", "C", "D", "E"]:
-            continue
+    data = request.get_json() or {}
+    urls = data.get('urls')
+    if not isinstance(urls, list) or not urls:
+        return jsonify({"error": "urls 목록이 전달되지 않았습니다."}), 400
+    if len(urls) > MAX_QR_BULK:
+        return jsonify({"error": f"한 번에 최대 {MAX_QR_BULK}개까지 등록할 수 있습니다."}), 400
 
-        # 이제 <td>들이 최소 2개 존재:
-        #   첫 번째 <td class="result">낙첨</td>
-        #   두 번째 <td> 안에 <span class="clr">...</span> 번호들
-        tds = tr.find_all("td")
-        if len(tds) < 2:
-            continue
+    def generate():
+        workers = max(1, min(QR_BULK_WORKERS, len(urls)))
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            futures = {executor.submit(verify_qr_ticket, url): (i, url) for i, url in enumerate(urls)}
+            for future in as_completed(futures):
+                i, url = futures[future]
+                try:
+                    result = {"index": i, "url": url, "status": 200, **future.result()}
+                except QRTicketError as e:
+                    result = {"index": i, "url": url, "status": e.status, **e.to_dict()}
+                except Exception as e:
+                    result = {"index": i, "url": url, "status": 500, "error": str(e)}
+                yield json.dumps(result, ensure_ascii=False) + "\n"
+        finally:
+            # 클라이언트가 연결을 끊으면(GeneratorExit) 남은 조회를 기다리지 않고 취소
+            executor.shutdown(wait=False, cancel_futures=True)
 
-        # 실제로는 tds[0]이 '낙첨'이고, tds[1]이 번호들
-        # 즉, 3개의 열이면 tds[0], tds[1], tds[2]... 등 구조에 따라 달라질 수 있음
-        # 스크린샷 상으론 tds[0] -> 낙첨, tds[1] -> <span class="clr">3</span> ...
-        # 만약 td가 2개뿐이라면 tds[1]이 번호
-        # 만약 td가 3개라면 tds[2]가 번호 (상황에 맞게 수정)
-        # 여기서는 2개뿐이라 가정 -> tds[1]이 번호 열
-        # (스크린샷에 따르면 td가 총 2개뿐이 아니라 3개 같으니, 실제 구조를 다시 확인하세요)
-
-        # 예시로 tds[1]을 번호 열로 가정
-        number_td = tds[1]
-
-        # <td> 안의 <span class="clr">...</span>들을 찾는다
-        span_in_td = number_td.find_all("span", class_="clr")
-        row_numbers = []
-        for sp in span_in_td:
-            text = sp.get_text(strip=True)
-            if re.match(r'^\d{1,2}$', text):
-                row_numbers.append(int(text))
-
-        rows_data.append({
-            "row": label,
-            "numbers": row_numbers
-        })
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+# -----------------------------
+# 7) 티켓 백테스트 (역대 회차 전체 대비 당첨 이력)
+# -----------------------------
+MAX_BACKTEST_TICKETS = 50000  # /api/tickets/backtest 1회 요청 최대 티켓 수
 
-    print("[DEBUG] A~E 행 파싱 결과:", rows_data)
+def parse_ticket_list(tickets):
+    """
+    [[1, 2, 3, 4, 5, 6], ...] 또는 register-lotto의 rowData([{"row": "A", "numbers": [...]}, ...])를
+    (라벨 목록, 번호 목록)으로 변환합니다.
+    """
+    labels, numbers = [], []
+    for i, ticket in enumerate(tickets):
+        if isinstance(ticket, dict):
+            labels.append(ticket.get("row", i))
+            numbers.append(ticket.get("numbers"))
+        else:
+            labels.append(i)
+            numbers.append(ticket)
+    for ticket in numbers:
+        if not isinstance(ticket, list) or len(ticket) != 6 or not all(isinstance(n, int) for n in ticket):
+            raise ValueError("티켓은 정수 번호 6개로 이루어져야 합니다.")
+    return labels, numbers
+
+@app.route('/api/tickets/backtest', methods=['POST', 'OPTIONS'])
+@cross_origin()
+def backtest_tickets():
+    """
+    티켓들이 저장소의 모든 회차에서 3/4/5/5+보너스/6개를 몇 번 맞혔는지 계산합니다.
+    요청: {"tickets": [...], "from_round": 선택, "to_round": 선택}
+    """
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    data = request.get_json() or {}
+    tickets = data.get('tickets')
+    if not isinstance(tickets, list) or not tickets:
+        return jsonify({"error": "tickets 목록이 전달되지 않았습니다."}), 400
+    if len(tickets) > MAX_BACKTEST_TICKETS:
+        return jsonify({"error": f"한 번에 최대 {MAX_BACKTEST_TICKETS}개까지 확인할 수 있습니다."}), 400
+    try:
+        labels, numbers = parse_ticket_list(tickets)
+        ticket_matrix = encode_tickets(numbers)
+        from_round = int(data.get('from_round') or 1)
+        to_round = int(data.get('to_round') or get_snapshot()["round"])
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    started = time.perf_counter()
+    winning, bonus, rounds = encode_draws(get_draw_store().array())
+    selected = (rounds >= from_round) & (rounds <= to_round)
+    prize_counts = count_prizes(ticket_matrix, winning[selected], bonus[selected])
+    elapsed = time.perf_counter() - started
 
     return jsonify({
-        "registeredNumbers": winning_numbers,
-        "bonus": bonus_number,
-        "rowData": rows_data
+        "rounds": {"from": int(rounds[selected][0]) if selected.any() else None,
+                   "to": int(rounds[selected][-1]) if selected.any() else None,
+                   "count": int(selected.sum())},
+        "results": [
+            {"ticket": label, "numbers": ticket, **dict(zip(PRIZE_KEYS, counts))}
+            for label, ticket, counts in zip(labels, numbers, prize_counts.tolist())
+        ],
+        "totals": dict(zip(PRIZE_KEYS, prize_counts.sum(axis=0).tolist())),
+        "elapsed_ms": round(elapsed * 1000, 3)
     })
+
+# -----------------------------
+# 8) 운영 명령 (요청 경로 밖에서 실행)
+# -----------------------------
+@app.cli.command("cross-check")
+def cross_check_command():
+    """statByNumber 스크래핑 결과로 로컬 통계를 교차 검증합니다: flask --app app cross-check"""
+    result = cross_check(get_stats_engine(), fetch_lotto_probability())
+    print(f"스크래핑 추정 회차: {result['scraped_round']}, 추첨일 기준 회차: {result['clock_round']}, "
+          f"로컬 회차: {result['local_first_round']} ~ {result['local_last_round']}")
+    if not result["complete_history"]:
+        print("[WARN] 로컬 이력이 1회차부터 시작하지 않아 번호별 차이는 누락 구간의 당첨 횟수입니다.")
+        print("번호별 차이:", result["diffs"])
+    elif result["mismatches"]:
+        print("[ERROR] 불일치 번호:", result["mismatches"])
+    else:
+        print("로컬 통계가 statByNumber와 일치합니다.")
+
+@app.cli.command("backfill")
+@click.option("--from", "from_round", type=int, default=1, help="시작 회차")
+@click.option("--to", "to_round", type=int, default=None, help="종료 회차 (기본: 추첨일 기준 최신 회차)")
+@click.option("--workers", type=int, default=None, help="동시 요청 수 (기본: BACKFILL_WORKERS)")
+@click.option("--batch", type=int, default=50, help="파일에 나눠 저장할 회차 단위")
+def backfill_command(from_round, to_round, workers, batch):
+    """누락된 회차를 병렬로 수집해 저장합니다: flask --app app backfill --from 1 --to N"""
+    to_round = to_round or latest_drawn_round()
+    existing = {item["round"] for item in load_historical_file()}
+    missing_rounds = [r for r in range(from_round, to_round + 1) if r not in existing]
+    print(f"수집 대상 회차: {len(missing_rounds)}개 ({from_round} ~ {to_round})")
+
+    # batch 단위로 회차 순서대로 저장해 중단되더라도 이어서 실행할 수 있도록 함
+    started = time.perf_counter()
+    fetched = 0
+    for i in range(0, len(missing_rounds), batch):
+        new_data = fetch_rounds_concurrently(missing_rounds[i:i + batch], workers)
+        if new_data:
+            save_new_rounds(new_data)
+            fetched += len(new_data)
+    print(f"{fetched}개 회차 저장 완료 ({time.perf_counter() - started:.1f}초)")
+
+@app.cli.command("import-json")
+@click.argument("json_path", default=HISTORICAL_FILE)
+def import_json_command(json_path):
+    """historical_data.json 형식 파일을 저장소로 가져옵니다: flask --app app import-json [파일]"""
+    written = DrawStore(DRAW_STORE_FILE).import_json(json_path)
+    print(f"{len(written)}개 회차를 {DRAW_STORE_FILE}에 추가했습니다.")
+
+@app.cli.command("export-json")
+@click.argument("json_path", default=EXPORT_FILE)
+def export_json_command(json_path):
+    """저장소를 historical_data.json 형식으로 내보냅니다: flask --app app export-json [파일]"""
+    store = DrawStore(DRAW_STORE_FILE)
+    store.export_json(json_path)
+    print(f"{len(store.records())}개 회차를 {json_path}로 내보냈습니다.")
+
 # -----------------------------
-# 7) 메인 실행
+# 9) 메인 실행
 # -----------------------------
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
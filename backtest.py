@@ -0,0 +1,148 @@
+"""
+번호 추출 방법(1: 가중, 2: 무작위, 3: 역가중) 몬테카를로 백테스트.
+
+    python backtest.py --tickets-per-round 2000 --groups 1-10,11-20,21-30,31-40,41-45 --workers 8
+
+저장소의 회차를 순서대로 재생하며, 각 회차의 확률은 그 회차 이전 회차만으로 계산합니다. (미래 정보 없음)
+방법/번호군 조합마다 회차당 지정한 수의 티켓을 뽑아 해당 회차 당첨 번호와 비교하고
+등수별 분포를 출력합니다. 회차 구간을 --chunks개 작업으로 나눠 프로세스 풀에서 실행하며, 작업마다
+SeedSequence에서 파생한 독립적인 NumPy Generator를 사용합니다. 분할은 --workers와 무관하므로
+같은 --seed와 --chunks면 워커 수가 달라도 결과가 같습니다.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from draw_store import DrawStore
+from prize_checker import prize_distribution
+from sampling import generate_ticket_batch
+
+HISTORICAL_FILE = "historical_data.json"
+DRAW_STORE_FILE = os.environ.get("DRAW_STORE_FILE", "historical_data.bin")
+METHODS = {1: "weighted", 2: "random", 3: "inverse"}
+RESULT_KEYS = ("none", "3", "4", "5", "5+bonus", "6")
+DEFAULT_CHUNKS = 64  # 작업 분할 수는 --workers와 무관해야 같은 --seed가 같은 결과를 냄
+
+def load_draws():
+    """저장소(없으면 historical_data.json)에서 (회차 수 x 7) 배열을 읽습니다."""
+    store = DrawStore(DRAW_STORE_FILE)
+    if store.exists():
+        records = store.records()
+    else:
+        with open(HISTORICAL_FILE, "r") as f:
+            records = sorted(json.load(f), key=lambda x: x["round"])
+    rounds = np.array([item["round"] for item in records], dtype=np.int64)
+    draws = np.array([item["winning_numbers"] + [item.get("bonus") or 0] for item in records], dtype=np.int64)
+    return rounds, draws
+
+def prefix_probabilities(draws):
+    """
+    i번째 행 = 0 ~ i-1번째 회차만으로 계산한 번호별 확률 (LottoStatsEngine과 동일한 식).
+    보너스 번호를 포함한 당첨 횟수 / 회차 수 / 7
+    """
+    counts = np.zeros((len(draws) + 1, 46), dtype=np.float64)
+    for i, draw in enumerate(draws):
+        counts[i + 1] = counts[i]
+        numbers = draw[draw > 0]
+        counts[i + 1, numbers] += 1
+    seen = np.arange(len(draws) + 1, dtype=np.float64)
+    seen[0] = 1
+    return counts / seen[:, None] / 7
+
+# -----------------------------
+# 작업 프로세스
+# -----------------------------
+_draws = None
+_probabilities = None
+
+def _init_worker(draws, probabilities):
+    global _draws, _probabilities
+    _draws = draws
+    _probabilities = probabilities
+
+def _run_task(task):
+    method, groups, indexes, tickets_per_round, seed = task
+    rng = np.random.default_rng(seed)
+    totals = dict.fromkeys(RESULT_KEYS, 0)
+    for i in indexes:
+        tickets = generate_ticket_batch(groups, _probabilities[i], method, tickets_per_round, rng=rng)
+        counts = prize_distribution(tickets, _draws[i, :6], _draws[i, 6])
+        for key in RESULT_KEYS:
+            totals[key] += counts[key]
+    return method, _groups_label(groups), totals
+
+def _groups_label(groups):
+    return ",".join(f"{a}-{b}" for a, b in groups)
+
+def parse_groups(text):
+    groups = []
+    for part in text.split(","):
+        a, b = part.split("-")
+        groups.append([int(a), int(b)])
+    return groups
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--methods", default="1,2,3", help="비교할 방법 (기본: 1,2,3)")
+    parser.add_argument("--groups", action="append", help="번호군 선택, 여러 번 지정 가능 (기본: 전체 번호군)")
+    parser.add_argument("--tickets-per-round", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=10, help="확률 계산에만 사용하는 앞쪽 회차 수")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunks", type=int, default=DEFAULT_CHUNKS, help=f"방법/번호군마다 나눌 작업 수, 시드 재현에 포함 (기본: {DEFAULT_CHUNKS})")
+    parser.add_argument("--seed", type=int, default=None, help="재현용 시드")
+    parser.add_argument("--json", dest="json_path", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    methods = [int(m) for m in args.methods.split(",")]
+    group_sets = [parse_groups(g) for g in (args.groups or ["1-10,11-20,21-30,31-40,41-45"])]
+    rounds, draws = load_draws()
+    if len(draws) <= args.warmup:
+        sys.exit("백테스트할 회차가 부족합니다.")
+    probabilities = prefix_probabilities(draws)
+
+    indexes = np.arange(args.warmup, len(draws))
+    chunks = np.array_split(indexes, max(1, args.chunks))
+    chunks = [chunk.tolist() for chunk in chunks if len(chunk)]
+    combos = [(method, groups) for method in methods for groups in group_sets]
+    seeds = np.random.SeedSequence(args.seed).spawn(len(combos) * len(chunks))
+    tasks = [
+        (method, groups, chunk, args.tickets_per_round, seeds[c * len(chunks) + k])
+        for c, (method, groups) in enumerate(combos)
+        for k, chunk in enumerate(chunks)
+    ]
+
+    print(f"회차 {rounds[args.warmup]} ~ {rounds[-1]} ({len(indexes)}회), "
+          f"조합 {len(combos)}개, 조합당 티켓 {len(indexes) * args.tickets_per_round:,}장, 작업 {len(tasks)}개")
+    started = time.perf_counter()
+    results = {}
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                             initargs=(draws, probabilities)) as executor:
+        for method, label, totals in executor.map(_run_task, tasks):
+            combined = results.setdefault((method, label), dict.fromkeys(RESULT_KEYS, 0))
+            for key in RESULT_KEYS:
+                combined[key] += totals[key]
+    elapsed = time.perf_counter() - started
+
+    report = []
+    print(f"\n{'method':<10}{'groups':<34}{'tickets':>12}" + "".join(f"{k:>10}" for k in RESULT_KEYS[1:])
+          + f"{'win/1M':>10}")
+    for (method, label), totals in sorted(results.items()):
+        tickets = sum(totals.values())
+        wins = tickets - totals["none"]
+        print(f"{METHODS.get(method, method):<10}{label:<34}{tickets:>12,}"
+              + "".join(f"{totals[k]:>10,}" for k in RESULT_KEYS[1:])
+              + f"{wins / tickets * 1e6:>10.0f}")
+        report.append({"method": method, "groups": label, "tickets": tickets, **totals})
+    print(f"\n소요 시간: {elapsed:.1f}초 ({sum(r['tickets'] for r in report) / elapsed:,.0f} 티켓/초)")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"rounds": [int(rounds[args.warmup]), int(rounds[-1])], "results": report}, f, indent=4)
+
+if __name__ == "__main__":
+    main()
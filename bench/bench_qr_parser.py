@@ -0,0 +1,97 @@
+"""
+QR 당첨 확인 페이지 파싱 마이크로 벤치마크.
+
+    python bench/bench_qr_parser.py [--repeat 200]
+
+bench/fixtures/qr/*.html 각 페이지에 대해 기존 방식(BeautifulSoup 전체 트리 + 모든 <span>/<tr> 순회)과
+qr_parser.parse_qr_html()의 티켓당 파싱 시간, 그리고 캐시 적중 시 조회 시간을 출력합니다.
+두 방식의 결과가 다르면 실패합니다.
+"""
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from qr_parser import QRResultCache, parse_qr_html  # noqa: E402
+
+FIXTURE_DIR = os.path.join(ROOT, "bench", "fixtures", "qr")
+
+def parse_full_tree(html):
+    """register_lotto의 기존 파싱 방식 (디버그 출력 제외)"""
+    soup = BeautifulSoup(html, 'html.parser')
+    numbers = []
+    for elem in soup.find_all('span'):
+        text = elem.get_text(strip=True)
+        if re.match(r'^\d{1,2}$', text):
+            numbers.append(int(text))
+    if len(numbers) < 6:
+        numbers = [int(x) for x in re.findall(r'\b\d{1,2}\b', soup.get_text())]
+        numbers = [n for n in numbers if 1 <= n <= 45]
+
+    rows_data = []
+    for tr in soup.find_all("tr"):
+        th = tr.find("th", {"scope": "row"})
+        if not th:
+            continue
+        label = th.get_text(strip=True)
+        if label not in ["A", "B", "C", "D", "E"]:
+            continue
+        tds = tr.find_all("td")
+        if len(tds) < 2:
+            continue
+        row_numbers = []
+        for sp in tds[1].find_all("span", class_="clr"):
+            text = sp.get_text(strip=True)
+            if re.match(r'^\d{1,2}$', text):
+                row_numbers.append(int(text))
+        rows_data.append({"row": label, "numbers": row_numbers})
+
+    return {
+        "registeredNumbers": numbers[:6],
+        "bonus": numbers[6] if len(numbers) > 6 else None,
+        "rowData": rows_data
+    }
+
+def per_call_us(func, arg, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func(arg)
+    return (time.perf_counter() - started) / repeat * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.html")))
+    if not paths:
+        sys.exit(f"픽스처 페이지가 없습니다: {FIXTURE_DIR}")
+
+    cache = QRResultCache()
+    print(f"{'fixture':<28}{'bytes':>8}{'full tree(us)':>16}{'scanner(us)':>14}{'cache hit(us)':>16}")
+    failed = False
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        name = os.path.basename(path)
+        if parse_full_tree(html) != parse_qr_html(html):
+            print(f"[ERROR] {name}: 파싱 결과가 기존 방식과 다릅니다.")
+            failed = True
+            continue
+        key = name
+        cache.put(key, parse_qr_html(html))
+        print(f"{name:<28}{len(html):>8}"
+              f"{per_call_us(parse_full_tree, html, args.repeat):>16.1f}"
+              f"{per_call_us(parse_qr_html, html, args.repeat):>14.1f}"
+              f"{per_call_us(cache.get, key, args.repeat * 100):>16.2f}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
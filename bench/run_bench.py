@@ -0,0 +1,208 @@
+"""
+핫패스 오프라인 벤치마크.
+
+    python bench/run_bench.py [--concurrency 8] [--requests 200] [--latency-ms 20] [--update-baseline]
+
+로컬 dhlottery 스텁 서버(bench/stub_server.py)를 띄우고 UPSTREAM_OVERRIDE로 앱의 업스트림을 스텁으로 돌린 뒤,
+앱을 로컬 HTTP 서버로 실행해 각 엔드포인트에 동시 부하를 줍니다.
+시나리오별 처리량과 p50/p95/p99 지연을 출력하고 bench/baseline.json과 비교해
+허용 범위(--tolerance)를 넘게 느려지면 종료 코드 1로 실패합니다.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "bench"))
+
+from stub_server import StubConfig, start_stub_server  # noqa: E402
+
+BASELINE_FILE = os.path.join(ROOT, "bench", "baseline.json")
+# 업스트림 속도 제한은 운영 기본값 그대로 적용하므로, 요청당 QR 20개인 일괄 조회는 요청 수를 줄여 측정
+REQUEST_SCALE = {"register_lotto_bulk": 0.1}
+ALL_GROUPS = [[1, 10], [11, 20], [21, 30], [31, 40], [41, 45]]
+
+def scenarios():
+    """(이름, HTTP 메서드, 경로, 요청 본문 생성 함수)"""
+    def random_ticket(i):
+        return sorted(random.Random(i).sample(range(1, 46), 6))
+
+    return [
+        ("numbers", "POST", "/api/numbers",
+         lambda i: {"selected_groups": ALL_GROUPS[:3], "method": i % 3 + 1}),
+        ("numbers_batch", "POST", "/api/numbers/batch",
+         lambda i: {"selected_groups": ALL_GROUPS, "method": i % 3 + 1, "count": 1000}),
+        ("recommend", "GET", "/api/numbers/recommend", None),
+        ("lotto_current", "GET", "/api/lotto/current", None),
+        ("register_lotto", "POST", "/api/register-lotto",
+         lambda i: {"url": f"http://m.dhlottery.co.kr/?v=1160q{i:010d}"}),
+        ("register_lotto_bulk", "POST", "/api/register-lotto/bulk",
+         lambda i: {"urls": [f"http://m.dhlottery.co.kr/?v=1159q{i:06d}{k:04d}" for k in range(20)]}),
+        ("tickets_backtest", "POST", "/api/tickets/backtest",
+         lambda i: {"tickets": [random_ticket(i * 100 + k) for k in range(100)]}),
+    ]
+
+def run_http_scenario(base_url, method, path, body_fn, total, concurrency):
+    local = threading.local()
+
+    def one(i):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        started = time.perf_counter()
+        try:
+            response = session.request(method, base_url + path, json=body_fn(i) if body_fn else None, timeout=60)
+            response.content
+            ok = response.status_code < 400
+        except requests.RequestException:
+            ok = False
+        return time.perf_counter() - started, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(one, range(total)))
+    return summarize(results, time.perf_counter() - started)
+
+def run_update_scenario(app, seed_store, iterations):
+    """빈 회차가 있는 저장소 사본에서 update_historical_data() 한 번에 걸리는 시간"""
+    results = []
+    started_all = time.perf_counter()
+    for i in range(iterations):
+        store_path = os.path.join(os.path.dirname(seed_store), f"update-{i}.bin")
+        shutil.copyfile(seed_store, store_path)
+        reset_app_state(app, store_path)
+        started = time.perf_counter()
+        data = app.update_historical_data()
+        results.append((time.perf_counter() - started, bool(data)))
+    elapsed = time.perf_counter() - started_all
+    reset_app_state(app, seed_store)
+    return summarize(results, elapsed)
+
+def reset_app_state(app, store_path):
+    app.DRAW_STORE_FILE = store_path
+    app._draw_store = None
+    app._stats_engine = None
+    app._pattern_index = None
+    app._number_stats = None
+    app._cooccurrence = None
+    app._combo_space = None
+    app._snapshot = None
+
+def summarize(results, elapsed):
+    latencies = np.array([r[0] for r in results]) * 1000
+    errors = sum(1 for r in results if not r[1])
+    return {
+        "requests": len(results),
+        "throughput": round(len(results) / elapsed, 2),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 2),
+        "error_rate": round(errors / len(results), 4),
+    }
+
+def compare(results, baseline, tolerance):
+    """기준선 대비 p95 지연이 (1 + tolerance)배를 넘거나 처리량이 (1 - tolerance)배 미만이면 회귀"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if result["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base['p95_ms']}ms -> {result['p95_ms']}ms")
+        if result["throughput"] < base["throughput"] * (1 - tolerance):
+            regressions.append(f"{name}: 처리량 {base['throughput']}/s -> {result['throughput']}/s")
+        if result["error_rate"] > base["error_rate"] + 0.01:
+            regressions.append(f"{name}: 오류율 {base['error_rate']} -> {result['error_rate']}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="시나리오별 요청 수")
+    parser.add_argument("--update-iterations", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="스텁 서버 응답 지연")
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="스텁 서버 503 비율")
+    parser.add_argument("--only", action="append", help="실행할 시나리오 (여러 번 지정 가능)")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--tolerance", type=float, default=0.3)
+    parser.add_argument("--update-baseline", action="store_true", help="이번 결과로 기준선을 갱신")
+    parser.add_argument("--json", dest="json_path", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    config = StubConfig(args.latency_ms, args.jitter_ms, args.fail_rate)
+    stub, stub_url = start_stub_server(config)
+
+    # 앱 import 전에 업스트림/저장소/백그라운드 갱신 설정
+    workdir = tempfile.mkdtemp(prefix="lotto-bench-")
+    os.chdir(ROOT)
+    os.environ.update({
+        "UPSTREAM_OVERRIDE": stub_url,
+        "REFRESH_SCHEDULER": "0",
+        "DRAW_STORE_FILE": os.path.join(workdir, "historical_data.bin"),
+    })
+    import app as app_module
+    from werkzeug.serving import make_server
+
+    app_module.warm_up()  # historical_data.json -> 임시 저장소, 인덱스 구성 (gunicorn preload와 같은 워밍업)
+    seed_store = app_module.DRAW_STORE_FILE
+    server = make_server("127.0.0.1", 0, app_module.app, threaded=True)
+    threading.Thread(target=server.serve_forever, name="bench-app", daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    results = {}
+    try:
+        for name, method, path, body_fn in scenarios():
+            if args.only and name not in args.only:
+                continue
+            total = max(1, int(args.requests * REQUEST_SCALE.get(name, 1)))
+            results[name] = run_http_scenario(base_url, method, path, body_fn, total, args.concurrency)
+            print(f"[bench] {name} 완료", file=sys.stderr)
+        if not args.only or "update_historical_data" in args.only:
+            results["update_historical_data"] = run_update_scenario(app_module, seed_store,
+                                                                   args.update_iterations)
+    finally:
+        server.shutdown()
+        stub.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"\n{'scenario':<24}{'req':>6}{'req/s':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'err':>8}")
+    for name, r in results.items():
+        print(f"{name:<24}{r['requests']:>6}{r['throughput']:>10.1f}{r['p50_ms']:>10.1f}"
+              f"{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}{r['error_rate']:>8.2%}")
+    print(f"스텁 서버 요청 수: {config.requests}")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=4)
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=4)
+        print(f"기준선을 갱신했습니다: {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("[WARN] 기준선 파일이 없어 비교하지 않습니다. --update-baseline으로 생성하세요.")
+        return
+    with open(args.baseline, "r") as f:
+        regressions = compare(results, json.load(f), args.tolerance)
+    if regressions:
+        print("\n[ERROR] 성능 회귀:")
+        for line in regressions:
+            print("  " + line)
+        sys.exit(1)
+    print("\n기준선 대비 회귀 없음.")
+
+if __name__ == "__main__":
+    main()
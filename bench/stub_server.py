@@ -0,0 +1,168 @@
+"""
+dhlottery.co.kr 로컬 대역 서버 (벤치마크/오프라인 테스트용).
+
+    python bench/stub_server.py --port 8765 --latency-ms 50 --jitter-ms 20 --fail-rate 0.01
+
+앱을 UPSTREAM_OVERRIDE=http://127.0.0.1:8765 로 실행하면 모든 업스트림 요청이 이 서버로 향합니다.
+  /gameResult.do?method=statByNumber    번호별 당첨 횟수 표
+  /gameResult.do?method=byWin           최신 회차 당첨 결과
+  /gameResult.do?method=byWin&drwNo=N   N회차 당첨 결과 (미발표 회차는 최신 회차 페이지)
+  /qr.do?method=winQr&v=...             bench/fixtures/qr/ 의 기록된 QR 페이지
+페이지 구조는 bench/fixtures/의 기록된 페이지 틀을 따르며, 당첨 번호는 historical_data.json에서 채웁니다.
+기록에 없는 회차(1회차 이전 구간, 마지막 기록 이후 ~ --latest)는 회차 번호를 시드로 한 결정적 번호를 사용합니다.
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from lotto_stats import latest_drawn_round  # noqa: E402
+
+FIXTURE_DIR = os.path.join(ROOT, "bench", "fixtures")
+
+class StubConfig:
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, fail_rate=0.0, hang_rate=0.0, hang_sec=30.0, latest=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.fail_rate = fail_rate  # 503 응답 비율
+        self.hang_rate = hang_rate  # hang_sec 동안 응답하지 않는 비율 (타임아웃 주입)
+        self.hang_sec = hang_sec
+        self.latest = latest or latest_drawn_round()
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def count(self):
+        with self._lock:
+            self.requests += 1
+
+class DrawBook:
+    """historical_data.json + 결정적 가상 회차로 1 ~ latest 회차 당첨 번호를 제공합니다."""
+
+    def __init__(self, latest):
+        with open(os.path.join(ROOT, "historical_data.json"), "r") as f:
+            self.recorded = {item["round"]: item for item in json.load(f)}
+        self.latest = latest
+
+    def get(self, round_num):
+        if round_num in self.recorded:
+            item = self.recorded[round_num]
+            return item["winning_numbers"], item.get("bonus")
+        picked = random.Random(round_num).sample(range(1, 46), 7)
+        return sorted(picked[:6]), picked[6]
+
+    def counts(self):
+        counts = dict.fromkeys(range(1, 46), 0)
+        for r in range(1, self.latest + 1):
+            numbers, bonus = self.get(r)
+            for n in numbers + [bonus]:
+                counts[n] += 1
+        return counts
+
+def _read_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+def make_handler(config, book):
+    by_win_template = _read_fixture("byWin.html")
+    stat_template = _read_fixture("statByNumber.html")
+    qr_pages = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, "qr", "*.html"))):
+        with open(path, encoding="utf-8") as f:
+            qr_pages[os.path.basename(path)] = f.read()
+    qr_names = sorted(qr_pages)
+    stat_cache = {}
+
+    def render_by_win(round_num):
+        numbers, bonus = book.get(round_num)
+        balls = "\n".join(f'<span class="ball_645 lrg ball{(n - 1) // 10 + 1}">{n}</span>' for n in numbers)
+        bonus_ball = f'<span class="ball_645 lrg ball{(bonus - 1) // 10 + 1}">{bonus}</span>'
+        return by_win_template.replace("{{ROUND}}", str(round_num)).replace("{{BALLS}}", balls).replace(
+            "{{BONUS}}", bonus_ball)
+
+    def render_stat():
+        if "page" not in stat_cache:
+            rows = "\n".join(
+                f"<tr><td>{n}</td><td><div class=\"graph\"></div></td><td>{count}</td></tr>"
+                for n, count in book.counts().items())
+            stat_cache["page"] = stat_template.replace("{{ROWS}}", rows)
+        return stat_cache["page"]
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            config.count()
+            delay = config.latency_ms + random.uniform(-config.jitter_ms, config.jitter_ms)
+            if delay > 0:
+                time.sleep(delay / 1000)
+            if config.hang_rate and random.random() < config.hang_rate:
+                time.sleep(config.hang_sec)
+            if config.fail_rate and random.random() < config.fail_rate:
+                return self._send(503, "<html><body>Service Unavailable</body></html>")
+
+            parts = urlsplit(self.path)
+            query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+            method = query.get("method")
+            if parts.path == "/gameResult.do" and method == "statByNumber":
+                return self._send(200, render_stat())
+            if parts.path == "/gameResult.do" and method == "byWin":
+                round_num = int(query.get("drwNo") or config.latest)
+                return self._send(200, render_by_win(round_num if round_num <= config.latest else config.latest))
+            if parts.path == "/qr.do" and method == "winQr" and qr_names:
+                # 같은 v= 값에는 항상 같은 페이지
+                v = query.get("v", "")
+                return self._send(200, qr_pages[qr_names[sum(map(ord, v)) % len(qr_names)]])
+            return self._send(404, "<html><body>Not Found</body></html>")
+
+        def _send(self, status, body):
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
+
+def start_stub_server(config, host="127.0.0.1", port=0):
+    """백그라운드 스레드에서 스텁 서버를 시작하고 (server, base_url)을 반환합니다."""
+    server = ThreadingHTTPServer((host, port), make_handler(config, DrawBook(config.latest)))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="dhlottery-stub", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--hang-rate", type=float, default=0.0)
+    parser.add_argument("--hang-sec", type=float, default=30.0)
+    parser.add_argument("--latest", type=int, default=None, help="최신 회차 (기본: 추첨일 기준)")
+    args = parser.parse_args()
+
+    config = StubConfig(args.latency_ms, args.jitter_ms, args.fail_rate, args.hang_rate, args.hang_sec, args.latest)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(config, DrawBook(config.latest)))
+    server.daemon_threads = True
+    print(f"dhlottery 스텁 서버: http://{args.host}:{args.port} (최신 회차 {config.latest})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
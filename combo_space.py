@@ -0,0 +1,156 @@
+import threading
+from math import comb
+
+import numpy as np
+
+MAX_NUMBER = 45
+PICK = 6
+TOTAL = comb(MAX_NUMBER, PICK)  # 8,145,060
+BUILD_CHUNK = 1 << 20
+WEIGHTED_POOL = 1 << 16  # 가중 추출 시 가중치를 계산할 최대 후보 수
+GROUP_COUNT = 5  # 1~10, 11~20, 21~30, 31~40, 41~45
+
+# _BINOM[x, i] = C(x, i)
+_BINOM = np.array([[comb(x, i) for i in range(PICK + 1)] for x in range(MAX_NUMBER + 1)], dtype=np.int64)
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+_TAIL_MASK = np.uint8((0xFF << (-TOTAL % 8)) & 0xFF)  # 마지막 바이트에서 TOTAL을 넘는 비트 제외
+
+def rank(combos):
+    """
+    오름차순 6개 번호 조합(m x 6, 1~45)의 순위 (조합 수 체계, colex 순서).
+    rank([1, 2, 3, 4, 5, 6]) = 0, rank([40, ..., 45]) = TOTAL - 1
+    """
+    combos = np.sort(np.asarray(combos, dtype=np.int64).reshape(-1, PICK), axis=1) - 1
+    return _BINOM[combos, np.arange(1, PICK + 1)].sum(axis=1)
+
+def unrank(ranks):
+    """rank()의 역함수: 순위 배열 -> 오름차순 번호 조합 (m x 6, int8)"""
+    remaining = np.array(ranks, dtype=np.int64, copy=True).reshape(-1)
+    combos = np.empty((len(remaining), PICK), dtype=np.int8)
+    for i in range(PICK, 0, -1):
+        # C(x, i) <= 남은 순위인 가장 큰 x
+        x = np.searchsorted(_BINOM[:, i], remaining, side="right") - 1
+        combos[:, i - 1] = x + 1
+        remaining -= _BINOM[x, i]
+    return combos
+
+class ComboSpace:
+    """
+    6/45 전체 조합을 순위로 색인한 조건 필터.
+      sums           조합별 번호 합계 (uint8, 8MB)
+      odd[k]         홀수가 k개인 조합 비트셋 (k = 0~6)
+      run[r]         가장 긴 연속 번호가 r개인 조합 비트셋 (r = 1~6)
+      group[g]       g번째 번호군 번호를 포함하는 조합 비트셋
+      winners        역대 당첨 조합 비트셋
+    비트셋은 np.packbits 형식(조합당 1비트, 약 1MB)이며, 조건 조합은 비트 연산으로 만듭니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.sums = np.empty(TOTAL, dtype=np.uint8)
+        odd = np.empty(TOTAL, dtype=np.uint8)
+        run = np.empty(TOTAL, dtype=np.uint8)
+        group = np.empty((GROUP_COUNT, TOTAL), dtype=bool)
+        for start in range(0, TOTAL, BUILD_CHUNK):
+            end = min(TOTAL, start + BUILD_CHUNK)
+            combos = unrank(np.arange(start, end))
+            self.sums[start:end] = combos.sum(axis=1, dtype=np.int16)
+            odd[start:end] = (combos & 1).sum(axis=1)
+            run[start:end] = _max_runs(combos)
+            group_index = (combos - 1) // 10
+            for g in range(GROUP_COUNT):
+                group[g, start:end] = (group_index == g).any(axis=1)
+        self.odd = [np.packbits(odd == k) for k in range(PICK + 1)]
+        self.run = [None] + [np.packbits(run == r) for r in range(1, PICK + 1)]
+        self.group = [np.packbits(group[g]) for g in range(GROUP_COUNT)]
+        self.winners = np.zeros_like(self.group[0])
+
+    def load_winners(self, historical_data):
+        for item in historical_data:
+            self.add_winner(item["winning_numbers"])
+        return self
+
+    def add_winner(self, winning_numbers):
+        r = int(rank(winning_numbers[:PICK])[0])
+        with self._lock:
+            self.winners[r >> 3] |= np.uint8(0x80 >> (r & 7))
+
+    def valid_mask(self, sum_range=None, odd_counts=None, max_run=None, groups=None, exclude_winners=True):
+        """
+        조건을 모두 만족하는 조합 비트셋.
+          sum_range  (최소, 최대) 합계
+          odd_counts 허용하는 홀수 개수 목록
+          max_run    허용하는 최대 연속 번호 길이
+          groups     반드시 포함할 번호군 인덱스 목록 (나머지 번호군 번호는 제외)
+        """
+        mask = np.full_like(self.winners, 0xFF)
+        if odd_counts is not None:
+            mask &= _union(self.odd[k] for k in odd_counts if 0 <= k <= PICK)
+        if max_run is not None:
+            mask &= _union(self.run[r] for r in range(1, min(max_run, PICK) + 1))
+        if groups is not None:
+            for g in range(GROUP_COUNT):
+                mask &= self.group[g] if g in groups else ~self.group[g]
+        if exclude_winners:
+            mask &= ~self.winners
+        if sum_range is not None:
+            low, high = sum_range
+            mask &= np.packbits((self.sums >= low) & (self.sums <= high))
+        mask[-1] &= _TAIL_MASK
+        return mask
+
+    def sample(self, mask, count, log_weights=None, rng=None):
+        """
+        비트셋 안에서 서로 다른 조합 count개를 뽑습니다.
+        유효 조합 배열을 펼치지 않고, 바이트별 비트 수의 누적합에서 뽑은 서수(n번째 유효 조합)의 위치를 찾습니다.
+        log_weights(인덱스 = 번호)가 주어지면 조합 가중치 = 번호 가중치의 곱으로 Gumbel-top-k 추출합니다.
+        유효 조합이 WEIGHTED_POOL개보다 많으면 균등 표본 WEIGHTED_POOL개 안에서 가중 추출해 시간을 제한합니다.
+        반환: (티켓 배열 m x 6, 유효 조합 수)
+        """
+        rng = rng or np.random.default_rng()
+        bits = _POPCOUNT[mask]
+        cumulative = bits.astype(np.uint32)
+        np.cumsum(cumulative, out=cumulative)  # 제자리 누적 (dtype 지정 cumsum은 임시 버퍼를 추가로 잡음)
+        valid_count = int(cumulative[-1])
+        if not valid_count:
+            return np.empty((0, PICK), dtype=np.int64), 0
+        count = min(count, valid_count)
+        if log_weights is None:
+            picked = _select(mask, bits, cumulative, rng.choice(valid_count, size=count, replace=False))
+        else:
+            if valid_count > WEIGHTED_POOL:
+                ordinals = rng.choice(valid_count, size=WEIGHTED_POOL, replace=False)
+            else:
+                ordinals = np.arange(valid_count)
+            pool = _select(mask, bits, cumulative, ordinals)
+            keys = log_weights[unrank(pool).astype(np.intp)].sum(axis=1) + rng.gumbel(size=len(pool))
+            top = np.argpartition(-keys, count - 1)[:count] if count < len(pool) else np.arange(len(pool))
+            picked = pool[top]
+        return unrank(picked).astype(np.int64), valid_count
+
+def _select(mask, bits, cumulative, ordinals):
+    """서수(0부터, 유효 조합 중 n번째) -> 조합 순위. bits/cumulative는 바이트별 비트 수와 그 누적합"""
+    ordinals = np.asarray(ordinals, dtype=np.int64)
+    byte = np.searchsorted(cumulative, ordinals.astype(cumulative.dtype), side="right")  # 같은 dtype이라 복사 없음
+    within = ordinals - (cumulative[byte].astype(np.int64) - bits[byte])
+    seen = np.cumsum(np.unpackbits(mask[byte][:, None], axis=1), axis=1, dtype=np.uint8)
+    return byte * 8 + np.argmax(seen > within[:, None], axis=1)
+
+def _max_runs(combos):
+    """오름차순 조합별 가장 긴 연속 번호 길이"""
+    consecutive = np.diff(combos, axis=1) == 1
+    current = np.zeros(len(combos), dtype=np.uint8)
+    best = current.copy()
+    for j in range(PICK - 1):
+        current = (current + 1) * consecutive[:, j]
+        np.maximum(best, current, out=best)
+    return best + 1
+
+def _union(bitsets):
+    result = None
+    for bitset in bitsets:
+        result = bitset.copy() if result is None else result | bitset
+    return result if result is not None else np.zeros(_packed_size(), dtype=np.uint8)
+
+def _packed_size():
+    return (TOTAL + 7) // 8
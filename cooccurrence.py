@@ -0,0 +1,172 @@
+import heapq
+import os
+import threading
+from collections import Counter, OrderedDict
+from itertools import combinations, permutations
+
+import numpy as np
+
+MAX_NUMBER = 45
+DECAY_HALF_LIFE = float(os.environ.get("COOCCURRENCE_HALF_LIFE", "104"))  # 최근 가중 반감기(회차), 약 2년
+INITIAL_CAPACITY = 2048
+WINDOW_CACHE_SIZE = 4  # 구간 삼중 조합 집계 캐시 (질의 값마다 커지지 않도록 LRU)
+_TRIPLE_SLOTS = np.array(list(permutations(range(6), 3)), dtype=np.intp)  # 120 = 20조합 x 6 순서
+_PAIR_ROWS, _PAIR_COLS = np.triu_indices(MAX_NUMBER + 1, k=1)  # 번호쌍 (a < b) 990 + 0번 열 45
+_PAIR_ID = np.zeros((MAX_NUMBER + 1, MAX_NUMBER + 1), dtype=np.intp)
+_PAIR_ID[_PAIR_ROWS, _PAIR_COLS] = np.arange(len(_PAIR_ROWS))
+
+class CooccurrenceIndex:
+    """
+    번호 동시 출현 집계.
+      pair_counts      46 x 46 대칭 행렬 (0번 미사용), 같은 회차에 함께 나온 횟수
+      triples          {(a, b, c): [횟수, 감쇠 점수, 마지막 갱신 위치]} (나온 조합만 저장)
+      triple_counts    46 x 46 x 46 대칭 배열 (약 390KB), 삼중 조합 횟수를 모든 순서로 저장해 조건부 점수를 벡터 연산으로 계산
+      decayed_pairs    회차마다 2^(-1/반감기)를 곱해 최근 회차에 더 큰 가중을 둔 행렬
+      _cum_pairs[i]    앞쪽 i개 회차의 번호쌍(a < b)별 횟수 (회차 x 1035)
+    새 회차는 append_round()로 증분 반영합니다. 구간(최근 K회) 쌍 행렬은 누적 행 두 개의 차이이고,
+    구간 삼중 조합 횟수는 회차별 번호에서 계산해 최근 몇 개 구간만 캐시합니다.
+    보너스 번호는 집계하지 않습니다.
+    """
+
+    def __init__(self, half_life=DECAY_HALF_LIFE, capacity=INITIAL_CAPACITY):
+        self.half_life = half_life
+        self.factor = 0.5 ** (1.0 / half_life)
+        self._lock = threading.Lock()
+        self.size = 0
+        self.rounds = np.zeros(capacity, dtype=np.int64)
+        self.numbers = np.zeros((capacity, 6), dtype=np.int8)
+        self._cum_pairs = np.zeros((capacity + 1, len(_PAIR_ROWS)), dtype=np.int32)
+        self.pair_counts = np.zeros((MAX_NUMBER + 1, MAX_NUMBER + 1), dtype=np.int64)
+        self.decayed_pairs = np.zeros((MAX_NUMBER + 1, MAX_NUMBER + 1), dtype=np.float64)
+        self.triples = {}
+        self.triple_counts = np.zeros((MAX_NUMBER + 1,) * 3, dtype=np.int32)
+        self._window_cache = OrderedDict()
+
+    @property
+    def last_round(self):
+        return int(self.rounds[self.size - 1]) if self.size else 0
+
+    def load(self, historical_data):
+        for item in sorted(historical_data, key=lambda x: x["round"]):
+            self.append_round(item["round"], item["winning_numbers"])
+        return self
+
+    def append_round(self, round_num, winning_numbers):
+        """새 회차의 15개 쌍, 20개 삼중 조합을 반영합니다. 이미 반영된 회차 이전 회차는 무시합니다."""
+        numbers = sorted(int(n) for n in winning_numbers[:6])
+        with self._lock:
+            if round_num <= self.last_round:
+                return False
+            if self.size == len(self.rounds):
+                self.rounds = _resized(self.rounds, self.size * 2)
+                self.numbers = _resized(self.numbers, self.size * 2)
+                self._cum_pairs = _resized(self._cum_pairs, self.size * 2 + 1)
+            position = self.size
+
+            index = np.asarray(numbers, dtype=np.intp)
+            rows, cols = np.meshgrid(index, index, indexing="ij")
+            off_diagonal = rows != cols
+            self.pair_counts[rows[off_diagonal], cols[off_diagonal]] += 1
+            self.decayed_pairs *= self.factor
+            self.decayed_pairs[rows[off_diagonal], cols[off_diagonal]] += 1.0
+
+            for triple in combinations(numbers, 3):
+                entry = self.triples.get(triple)
+                if entry is None:
+                    self.triples[triple] = [1, 1.0, position]
+                else:
+                    entry[0] += 1
+                    entry[1] = entry[1] * self.factor ** (position - entry[2]) + 1.0
+                    entry[2] = position
+            self.triple_counts[tuple(index[_TRIPLE_SLOTS].T)] += 1
+            self._cum_pairs[position + 1] = self._cum_pairs[position]
+            self._cum_pairs[position + 1, _PAIR_ID[rows[rows < cols], cols[rows < cols]]] += 1
+
+            self.rounds[position] = round_num
+            self.numbers[position] = numbers
+            self.size = position + 1
+            self._window_cache.clear()
+            return True
+
+    # -----------------------------
+    # 집계 조회
+    # -----------------------------
+    def pair_matrix(self, last=None, decay=False):
+        """번호쌍 점수 행렬: 전체 횟수, 최근 last회 횟수, 또는 최근 가중 점수"""
+        if decay:
+            return self.decayed_pairs
+        if last is None or last >= self.size:
+            return self.pair_counts
+        counts = self._cum_pairs[self.size] - self._cum_pairs[self.size - last]
+        matrix = np.zeros((MAX_NUMBER + 1, MAX_NUMBER + 1), dtype=np.int64)
+        matrix[_PAIR_ROWS, _PAIR_COLS] = counts
+        return matrix + matrix.T
+
+    def triple_scores(self, last=None, decay=False):
+        """{(a, b, c): 점수} (나온 조합만)"""
+        if decay:
+            latest = self.size - 1
+            return {t: e[1] * self.factor ** (latest - e[2]) for t, e in self.triples.items()}
+        if last is None or last >= self.size:
+            return {t: e[0] for t, e in self.triples.items()}
+        return self._window_triples(last)
+
+    def _window_triples(self, last):
+        """최근 last회의 삼중 조합 횟수. 같은 최신 회차 안에서 최근 WINDOW_CACHE_SIZE개 구간만 캐시합니다."""
+        with self._lock:
+            size = self.size
+            cached = self._window_cache.get(last)
+            if cached is not None:
+                self._window_cache.move_to_end(last)
+                return cached
+            numbers = self.numbers[size - last:size].tolist()
+        triples = dict(Counter(t for row in numbers for t in combinations(row, 3)))
+        with self._lock:
+            if self.size == size:  # 계산 중 새 회차가 반영됐으면 캐시하지 않음
+                self._window_cache[last] = triples
+                if len(self._window_cache) > WINDOW_CACHE_SIZE:
+                    self._window_cache.popitem(last=False)
+        return triples
+
+    def top_pairs(self, k=10, number=None, last=None, decay=False):
+        matrix = self.pair_matrix(last, decay)
+        if number is not None:
+            row = matrix[number]
+            order = sorted(range(1, MAX_NUMBER + 1), key=lambda n: (-row[n], n))
+            return [{"numbers": sorted([number, n]), "score": _score(row[n])}
+                    for n in order if n != number][:k]
+        upper = np.triu(matrix[1:, 1:], k=1)
+        flat = np.argsort(-upper, axis=None, kind="stable")[:k]
+        return [{"numbers": [int(i) + 1, int(j) + 1], "score": _score(upper[i, j])}
+                for i, j in zip(*np.unravel_index(flat, upper.shape))]
+
+    def top_triples(self, k=10, number=None, last=None, decay=False):
+        scores = self.triple_scores(last, decay)
+        items = scores.items() if number is None else ((t, s) for t, s in scores.items() if number in t)
+        best = heapq.nsmallest(k, items, key=lambda item: (-item[1], item[0]))
+        return [{"numbers": list(t), "score": _score(s)} for t, s in best]
+
+    def conditional_scores(self, chosen):
+        """
+        이미 고른 번호(chosen)와 함께 나온 정도: 1 + 쌍 횟수 합 + 삼중 조합 횟수 합 (인덱스 = 번호)
+        번호별 기본 가중치에 곱해 조건부 가중치로 사용합니다.
+        """
+        scores = np.ones(MAX_NUMBER + 1, dtype=np.float64)
+        chosen = sorted(int(n) for n in chosen)
+        if not chosen:
+            return scores
+        scores += self.pair_counts[:, chosen].sum(axis=1)
+        if len(chosen) >= 2:
+            a, b = np.array(list(combinations(chosen, 2))).T
+            scores += self.triple_counts[a, b].sum(axis=0)
+        scores[chosen] = 0
+        scores[0] = 0
+        return scores
+
+def _score(value):
+    return int(value) if float(value).is_integer() else round(float(value), 4)
+
+def _resized(array, length):
+    resized = np.zeros((length,) + array.shape[1:], dtype=array.dtype)
+    resized[:len(array)] = array
+    return resized
@@ -0,0 +1,174 @@
+import fcntl
+import json
+import os
+import struct
+import tempfile
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+# 파일 구조
+#   헤더 16바이트: magic(8) | version(uint32) | 슬롯 수(uint32)
+#   레코드 7바이트 x 슬롯 수: 당첨 번호 6개 + 보너스 (uint8), 레코드 i = 회차 i+1
+#   아직 수집되지 않은 회차는 0으로 채워진 빈 슬롯입니다.
+MAGIC = b"LOTTO645"
+VERSION = 1
+HEADER = struct.Struct("<8sII")
+RECORD_SIZE = 7
+
+class DrawStore:
+    """
+    회차별 당첨 번호를 고정 폭 바이너리로 저장하는 추가 전용 저장소.
+    회차 번호로 O(1) 임의 접근하며, 쓰기는 파일 잠금 아래에서만 수행됩니다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock_path = path + ".lock"
+        self._lock = threading.Lock()
+        self._map = None
+        self._records = None
+        self._records_key = None
+
+    # -----------------------------
+    # 읽기
+    # -----------------------------
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def _read_count(self):
+        with open(self.path, "rb") as f:
+            magic, version, count = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"지원하지 않는 저장소 형식입니다: {self.path}")
+        return count
+
+    def array(self):
+        """(슬롯 수 x 7) uint8 읽기 전용 메모리 맵. 다른 프로세스가 추가한 회차도 반영합니다."""
+        with self._lock:
+            count = self._read_count()
+            if self._map is None or len(self._map) != count:
+                if count == 0:
+                    self._map = np.zeros((0, RECORD_SIZE), dtype=np.uint8)
+                else:
+                    self._map = np.memmap(self.path, dtype=np.uint8, mode="r",
+                                          offset=HEADER.size, shape=(count, RECORD_SIZE))
+            return self._map
+
+    def max_round(self):
+        draws = self.array()
+        filled = np.flatnonzero(draws[:, 0])
+        return int(filled[-1]) + 1 if len(filled) else 0
+
+    def get(self, round_num):
+        draws = self.array()
+        if not 1 <= round_num <= len(draws) or not draws[round_num - 1, 0]:
+            return None
+        return _to_record(round_num, draws[round_num - 1])
+
+    def records(self):
+        """historical_data.json과 같은 형태의 회차 목록 (파일이 바뀔 때만 다시 구성)"""
+        draws = self.array()
+        key = (len(draws), os.stat(self.path).st_mtime_ns)
+        if self._records_key != key:
+            self._records = [_to_record(i + 1, row) for i, row in enumerate(draws) if row[0]]
+            self._records_key = key
+        return self._records
+
+    # -----------------------------
+    # 쓰기
+    # -----------------------------
+    @contextmanager
+    def _file_lock(self):
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def append(self, items):
+        """
+        새 회차를 기록합니다. 이미 기록된 회차는 덮어쓰지 않습니다.
+        레코드를 먼저 쓰고 fsync 한 뒤 헤더의 슬롯 수를 갱신하므로
+        읽는 쪽은 절반만 쓰인 레코드를 보지 않습니다.
+        모든 레코드를 쓰기 전에 검증하므로, 잘못된 레코드가 하나라도 있으면 아무것도 기록하지 않습니다.
+        """
+        rows = sorted(((item["round"], _to_row(item), item) for item in items), key=lambda x: x[0])
+        written = []
+        with self._file_lock():
+            if not self.exists():
+                _write_atomic(self.path, np.zeros((0, RECORD_SIZE), dtype=np.uint8))
+            with open(self.path, "r+b") as f:
+                count = self._read_count()
+                new_count = count
+                for round_num, row, item in rows:
+                    offset = HEADER.size + (round_num - 1) * RECORD_SIZE
+                    if round_num <= count:
+                        f.seek(offset)
+                        if f.read(1) not in (b"", b"\x00"):
+                            continue
+                    elif round_num > new_count + 1:
+                        # 중간 공백은 빈 슬롯으로 채움
+                        f.seek(HEADER.size + new_count * RECORD_SIZE)
+                        f.write(bytes(RECORD_SIZE * (round_num - 1 - new_count)))
+                    f.seek(offset)
+                    f.write(row.tobytes())
+                    new_count = max(new_count, round_num)
+                    written.append(item)
+                f.flush()
+                os.fsync(f.fileno())
+                if new_count != count:
+                    f.seek(0)
+                    f.write(HEADER.pack(MAGIC, VERSION, new_count))
+                    f.flush()
+                    os.fsync(f.fileno())
+        return written
+
+    # -----------------------------
+    # JSON 가져오기/내보내기
+    # -----------------------------
+    def import_json(self, json_path):
+        """historical_data.json 형식의 파일을 가져옵니다. 기존 회차는 유지됩니다."""
+        with open(json_path, "r") as f:
+            return self.append(json.load(f))
+
+    def export_json(self, json_path):
+        _write_text_atomic(json_path, json.dumps(self.records(), indent=4))
+
+def _to_row(item):
+    round_num = item.get("round")
+    if not isinstance(round_num, int) or isinstance(round_num, bool) or round_num < 1:
+        raise ValueError(f"회차 번호가 올바르지 않습니다: {item}")
+    numbers = list(item["winning_numbers"][:6])
+    row = np.array(numbers + [item.get("bonus") or 0], dtype=np.uint8)
+    if len(numbers) != 6 or row[:6].min() < 1 or row.max() > 45:
+        raise ValueError(f"회차 {item['round']} 당첨 번호가 올바르지 않습니다: {item}")
+    return row
+
+def _to_record(round_num, row):
+    return {
+        "round": round_num,
+        "winning_numbers": [int(x) for x in row[:6]],
+        "bonus": int(row[6]) or None
+    }
+
+def _write_atomic(path, draws):
+    data = HEADER.pack(MAGIC, VERSION, len(draws)) + draws.tobytes()
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".draws-")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def _write_text_atomic(path, text):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".export-")
+    with os.fdopen(fd, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
@@ -0,0 +1,36 @@
+"""
+gunicorn 설정: gunicorn -c gunicorn.conf.py app:app
+
+preload_app으로 마스터가 app 모듈을 한 번 가져오고, 워커를 만들기 전에 warm_up()으로
+저장소 검증, 인덱스, 스냅샷, 조합 비트셋을 구성합니다. 워커는 fork로 이 상태를 copy-on-write 공유하므로
+첫 요청에서 JSON 로드, 인덱스 구성, 모듈 import 비용을 치르지 않습니다.
+"""
+import gc
+import multiprocessing
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("WEB_CONCURRENCY", str(min(4, multiprocessing.cpu_count() * 2 + 1))))
+threads = int(os.environ.get("GUNICORN_THREADS", "4"))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "60"))
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") == "1"
+
+def on_starting(server):
+    # 이전 실행 워커의 메트릭 파일이 합산되지 않도록 정리
+    from instrumentation import metrics
+    metrics.clear_files()
+
+def when_ready(server):
+    """워커 생성 직전(마스터): 워밍업 실패 시 예외로 기동을 중단합니다."""
+    if not preload_app:
+        return
+    import app
+    app.warm_up(preloaded=True)
+    app.metrics.flush()  # 시작 시간은 마스터 pid 파일로 한 번만 집계
+    # 워밍업으로 만든 객체를 GC 추적 대상에서 빼서, 워커의 GC가 공유 페이지를 건드려 복사되지 않게 함
+    gc.freeze()
+
+def post_fork(server, worker):
+    # METRICS_DIR가 있을 때만 마스터 값을 비움 (없으면 워커가 시작 시간 등을 그대로 보고)
+    from instrumentation import metrics
+    metrics.reset()
@@ -0,0 +1,217 @@
+import glob
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "text")  # text | json
+METRICS_DIR = os.environ.get("METRICS_DIR")  # gunicorn 워커 간 집계용 디렉터리 (미설정 시 프로세스 단위)
+METRICS_FLUSH_SEC = 1.0
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRICS = {
+    "lotto_stage_duration_seconds": ("histogram", "단계별 처리 시간 (upstream_fetch, html_parse, probability_compute(회차 반영 시 방법별 가중치 계산), sampling, store_load, store_save 등)"),
+    "lotto_http_request_duration_seconds": ("histogram", "API 엔드포인트별 응답 시간"),
+    "lotto_http_requests_total": ("counter", "API 엔드포인트/상태 코드별 요청 수"),
+    "lotto_upstream_requests_total": ("counter", "dhlottery 대상 페이지별 요청 수"),
+    "lotto_upstream_errors_total": ("counter", "dhlottery 대상 페이지별 요청 실패 수"),
+    "lotto_upstream_retries_total": ("counter", "dhlottery 대상 페이지별 재시도 수"),
+    "lotto_upstream_short_circuits_total": ("counter", "회로 차단으로 보내지 않은 요청 수"),
+    "lotto_startup_duration_seconds": ("gauge", "워밍업(저장소 검증, 인덱스/스냅샷 구성)에 걸린 시간 (mode=preload: fork 전 마스터, worker: 워커별)"),
+}
+
+# -----------------------------
+# 1) 로깅
+# -----------------------------
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            payload.update(fields)
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False)
+
+def setup_logging():
+    """
+    'lotto' 로거를 설정합니다. 레벨이 꺼진 로그는 logger.debug("...%s", value)처럼
+    지연 포맷 인자를 쓰므로 문자열을 만들지 않습니다.
+    """
+    logger = logging.getLogger("lotto")
+    if logger.handlers:
+        return logger
+    handler = logging.StreamHandler()
+    if LOG_FORMAT == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(process)d] %(name)s: %(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(LOG_LEVEL)
+    logger.propagate = False
+    return logger
+
+# -----------------------------
+# 2) 메트릭 (카운터, 히스토그램, 게이지)
+# -----------------------------
+class MetricsRegistry:
+    """
+    프로세스 내 카운터/히스토그램/게이지. METRICS_DIR이 설정되면 워커마다 pid 파일로 주기적으로 기록하고,
+    수집 시 모든 워커 파일을 합산합니다. (히스토그램은 고정 버킷이라 합산 가능, 게이지는 최댓값)
+    """
+
+    def __init__(self, metrics_dir=None):
+        self.metrics_dir = metrics_dir
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._gauges = {}
+        self._last_flush = 0.0
+
+    def reset(self):
+        """
+        fork된 워커에서 마스터로부터 복사된 값을 비웁니다.
+        마스터 값은 마스터 pid 파일에 남아 있으므로, 비우지 않으면 워커 수만큼 중복 합산됩니다.
+        METRICS_DIR이 없으면 워커는 자기 값만 보여 주므로, 시작 시간 등 마스터 값을 그대로 유지합니다.
+        """
+        self._lock = threading.Lock()
+        if not self.metrics_dir:
+            return
+        self._counters = {}
+        self._histograms = {}
+        self._gauges = {}
+        self._last_flush = 0.0
+
+    def clear_files(self):
+        """이전 실행에서 남은 워커 pid 파일을 지웁니다. (마스터 시작 시 한 번)"""
+        if not self.metrics_dir:
+            return
+        for path in glob.glob(os.path.join(self.metrics_dir, "metrics-*.json")):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+
+    def inc(self, name, labels=None, value=1):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+        self._maybe_flush()
+
+    def observe(self, name, seconds, labels=None):
+        key = (name, _label_key(labels))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = [0] * len(BUCKETS) + [0.0, 0]
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    hist[i] += 1
+            hist[-2] += seconds
+            hist[-1] += 1
+        self._maybe_flush()
+
+    def set(self, name, value, labels=None):
+        with self._lock:
+            self._gauges[(name, _label_key(labels))] = value
+        self._maybe_flush()
+
+    @contextmanager
+    def timer(self, stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("lotto_stage_duration_seconds", time.perf_counter() - started, {"stage": stage})
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "counters": [[name, list(labels), value] for (name, labels), value in self._counters.items()],
+                "histograms": [[name, list(labels), list(hist)] for (name, labels), hist in self._histograms.items()],
+                "gauges": [[name, list(labels), value] for (name, labels), value in self._gauges.items()],
+            }
+
+    def _maybe_flush(self):
+        if self.metrics_dir and time.monotonic() - self._last_flush >= METRICS_FLUSH_SEC:
+            self.flush()
+
+    def flush(self):
+        if not self.metrics_dir:
+            return
+        self._last_flush = time.monotonic()
+        os.makedirs(self.metrics_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.metrics_dir, prefix=".metrics-")
+        with os.fdopen(fd, "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp_path, os.path.join(self.metrics_dir, f"metrics-{os.getpid()}.json"))
+
+    def _collect(self):
+        if not self.metrics_dir:
+            return [self.snapshot()]
+        self.flush()
+        snapshots = []
+        for path in glob.glob(os.path.join(self.metrics_dir, "metrics-*.json")):
+            try:
+                with open(path, "r") as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    def render(self):
+        """모든 워커의 값을 합산해 Prometheus 텍스트 형식으로 반환합니다."""
+        counters, histograms, gauges = {}, {}, {}
+        for snapshot in self._collect():
+            for name, labels, value in snapshot["counters"]:
+                key = (name, tuple(map(tuple, labels)))
+                counters[key] = counters.get(key, 0) + value
+            for name, labels, hist in snapshot["histograms"]:
+                key = (name, tuple(map(tuple, labels)))
+                merged = histograms.setdefault(key, [0] * len(BUCKETS) + [0.0, 0])
+                for i, value in enumerate(hist):
+                    merged[i] += value
+            for name, labels, value in snapshot.get("gauges", []):
+                key = (name, tuple(map(tuple, labels)))
+                gauges[key] = max(gauges.get(key, value), value)
+
+        lines = []
+        for name, (kind, help_text) in METRICS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind in ("counter", "gauge"):
+                values = counters if kind == "counter" else gauges
+                for (metric, labels), value in sorted(values.items()):
+                    if metric == name:
+                        lines.append(f"{name}{_format_labels(labels)} {value}")
+            else:
+                for (metric, labels), hist in sorted(histograms.items()):
+                    if metric != name:
+                        continue
+                    for bound, count in zip(BUCKETS, hist):
+                        lines.append(f"{name}_bucket{_format_labels(labels + (('le', repr(bound)),))} {count}")
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {hist[-1]}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {hist[-2]}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {hist[-1]}")
+        return "\n".join(lines) + "\n"
+
+def _label_key(labels):
+    return tuple(sorted((labels or {}).items()))
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    body = ",".join(f'{k}="{str(v)}"' for k, v in labels)
+    return "{" + body + "}"
+
+metrics = MetricsRegistry(METRICS_DIR)
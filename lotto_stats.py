@@ -0,0 +1,131 @@
+import threading
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from instrumentation import metrics
+from sampling import METHODS, method_log_weights, method_weights
+
+KST = timezone(timedelta(hours=9))
+FIRST_DRAW_AT = datetime(2002, 12, 7, 20, 45, tzinfo=KST)  # 제1회 추첨 (토요일)
+DRAW_INTERVAL = timedelta(weeks=1)
+MAX_NUMBER = 45
+
+# -----------------------------
+# 1) 추첨일 기반 회차 시계
+# -----------------------------
+def latest_drawn_round(now=None):
+    """
+    추첨 일정(매주 토요일 20:45 KST)으로부터 가장 최근에 추첨이 끝난 회차를 계산합니다.
+    당첨 횟수 합계 // 7 추정과 달리 외부 페이지 없이 결정됩니다.
+    예: 2025-02-22 21:00 KST -> 1160
+    """
+    now = now or datetime.now(KST)
+    if now < FIRST_DRAW_AT:
+        return 0
+    return (now - FIRST_DRAW_AT) // DRAW_INTERVAL + 1
+
+def draw_time_of_round(round_num):
+    """해당 회차의 추첨 시각(KST)을 반환합니다."""
+    return FIRST_DRAW_AT + DRAW_INTERVAL * (round_num - 1)
+
+def next_draw_time(now=None):
+    """다음 추첨 시각(KST)을 반환합니다."""
+    return draw_time_of_round(latest_drawn_round(now) + 1)
+
+# -----------------------------
+# 2) 로컬 통계 엔진
+# -----------------------------
+class LottoStatsEngine:
+    """
+    historical_data.json 기반 번호별 당첨 횟수 통계.
+    statByNumber 페이지와 같이 보너스 번호까지 포함해 집계하며,
+    새 회차가 추가될 때마다 배열을 증분 갱신하고, 추출 방법별 가중치/로그 가중치도 함께 다시 계산해 둡니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.win_counts = np.zeros(MAX_NUMBER + 1, dtype=np.int64)    # 인덱스 = 번호 (0번 미사용)
+        self.bonus_counts = np.zeros(MAX_NUMBER + 1, dtype=np.int64)
+        self.rounds = 0
+        self.first_round = None
+        self.last_round = 0
+        self._refresh_probabilities()
+
+    def load(self, historical_data):
+        with self._lock:
+            for item in sorted(historical_data, key=lambda x: x["round"]):
+                self._append_locked(item["round"], item["winning_numbers"], item.get("bonus"))
+            self._refresh_probabilities()
+        return self
+
+    def append_round(self, round_num, winning_numbers, bonus=None):
+        """새 회차를 반영합니다. 이미 반영된 회차는 무시합니다."""
+        with self._lock:
+            if not self._append_locked(round_num, winning_numbers, bonus):
+                return False
+            self._refresh_probabilities()
+            return True
+
+    def _append_locked(self, round_num, winning_numbers, bonus):
+        if round_num <= self.last_round:
+            return False
+        np.add.at(self.win_counts, np.asarray(winning_numbers[:6], dtype=np.intp), 1)
+        if bonus:
+            self.bonus_counts[bonus] += 1
+        self.rounds += 1
+        if self.first_round is None:
+            self.first_round = round_num
+        self.last_round = round_num
+        return True
+
+    def _refresh_probabilities(self):
+        # 번호별 확률 = (보너스 포함 당첨 횟수 / 회차 수) / 7
+        with metrics.timer("probability_compute"):
+            total = self.win_counts + self.bonus_counts
+            probabilities = np.zeros(MAX_NUMBER + 1, dtype=np.float64)
+            if self.rounds:
+                probabilities = total / self.rounds / 7
+            # 요청 스레드들이 공유하므로 읽기 전용으로 고정하고, 갱신 시에는 새 배열로 교체
+            weights = {m: _frozen(method_weights(probabilities, m)) for m in METHODS}
+            log_weights = {m: _frozen(method_log_weights(probabilities, m)) for m in METHODS}
+        self._probabilities = _frozen(probabilities)
+        self._weights, self._log_weights = weights, log_weights
+
+    def probability_data(self):
+        """fetch_lotto_probability()와 같은 형태의 {번호: 당첨 횟수(보너스 포함)}"""
+        total = self.win_counts + self.bonus_counts
+        return {number: int(total[number]) for number in range(1, MAX_NUMBER + 1)}
+
+    def probability_array(self):
+        """번호를 인덱스로 하는 확률 배열 (0번 미사용, 읽기 전용으로 사용)"""
+        return self._probabilities
+
+    def method_weights(self, method_choice):
+        """추출 방법별 번호 가중치 (인덱스 = 번호, 3 = 역가중치)"""
+        return self._weights[method_choice]
+
+    def method_log_weights(self, method_choice):
+        return self._log_weights[method_choice]
+
+def _frozen(array):
+    array.flags.writeable = False
+    return array
+
+def cross_check(engine, scraped_data):
+    """
+    statByNumber 스크래핑 결과와 로컬 통계를 비교합니다. (요청 경로 밖에서 사용)
+    로컬 이력이 1회차부터 시작하지 않으면 번호별 차이는 누락 구간의 당첨 횟수가 됩니다.
+    """
+    local_data = engine.probability_data()
+    diffs = {number: scraped_data.get(number, 0) - local_data[number] for number in local_data}
+    scraped_round = sum(scraped_data.values()) // 7
+    return {
+        "scraped_round": scraped_round,
+        "clock_round": latest_drawn_round(),
+        "local_first_round": engine.first_round,
+        "local_last_round": engine.last_round,
+        "complete_history": engine.first_round == 1,
+        "mismatches": {n: d for n, d in diffs.items() if d != 0} if engine.first_round == 1 else {},
+        "diffs": diffs,
+    }
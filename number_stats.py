@@ -0,0 +1,141 @@
+import threading
+from itertools import combinations_with_replacement
+
+import numpy as np
+
+MAX_NUMBER = 45
+SUM_BUCKET = 20  # 합계 분포 구간 폭 (0~19, 20~39, ... 240~259)
+SUM_BUCKETS = 13
+INITIAL_CAPACITY = 2048
+GROUP_COUNT = 5
+PATTERNS = list(combinations_with_replacement(range(1, GROUP_COUNT + 1), 6))  # 가능한 번호군 패턴 210개
+
+class NumberStatsIndex:
+    """
+    번호 통계 누적 집계.
+      _cum[i]     = 앞쪽 i개 회차의 번호별 당첨 횟수 (회차 x 46, 0번 미사용)
+      _cum_odd[i] = 앞쪽 i개 회차의 홀수 개수(0~6)별 회차 수
+      _cum_sum[i] = 앞쪽 i개 회차의 합계 구간별 회차 수
+      _cum_pattern[i] = 앞쪽 i개 회차의 번호군 패턴(PATTERNS 210개)별 회차 수
+      last_seen   = 번호별 마지막 당첨 회차 (0 = 없음)
+    구간 [start, end) 질의는 누적 행 두 개의 차이라 O(45)이고, 새 회차 추가는 행 하나만 채웁니다.
+    보너스 번호는 집계하지 않습니다.
+    """
+
+    def __init__(self, pattern_func, capacity=INITIAL_CAPACITY):
+        self._pattern_func = pattern_func
+        self._lock = threading.Lock()
+        self.size = 0
+        self.rounds = np.zeros(capacity, dtype=np.int64)
+        self._cum = np.zeros((capacity + 1, MAX_NUMBER + 1), dtype=np.int32)
+        self._cum_odd = np.zeros((capacity + 1, 7), dtype=np.int32)
+        self._cum_sum = np.zeros((capacity + 1, SUM_BUCKETS), dtype=np.int32)
+        self._cum_total = np.zeros(capacity + 1, dtype=np.int64)  # 당첨 번호 합계의 누적합
+        self._cum_pattern = np.zeros((capacity + 1, len(PATTERNS)), dtype=np.int32)
+        self._pattern_lookup = {pattern: i for i, pattern in enumerate(PATTERNS)}
+        self.last_seen = np.zeros(MAX_NUMBER + 1, dtype=np.int64)
+
+    @property
+    def last_round(self):
+        return int(self.rounds[self.size - 1]) if self.size else 0
+
+    def load(self, historical_data):
+        for item in sorted(historical_data, key=lambda x: x["round"]):
+            self.append_round(item["round"], item["winning_numbers"])
+        return self
+
+    def append_round(self, round_num, winning_numbers):
+        """새 회차를 누적 행 하나로 추가합니다. 이미 반영된 회차 이전 회차는 무시합니다."""
+        with self._lock:
+            if round_num <= self.last_round:
+                return False
+            if self.size == len(self.rounds):
+                self._grow()
+            i = self.size
+            numbers = np.asarray(winning_numbers[:6], dtype=np.intp)
+            total = int(numbers.sum())
+
+            self._cum[i + 1] = self._cum[i]
+            self._cum[i + 1, numbers] += 1
+            self._cum_odd[i + 1] = self._cum_odd[i]
+            self._cum_odd[i + 1, int((numbers % 2).sum())] += 1
+            self._cum_sum[i + 1] = self._cum_sum[i]
+            self._cum_sum[i + 1, min(total // SUM_BUCKET, SUM_BUCKETS - 1)] += 1
+            self._cum_total[i + 1] = self._cum_total[i] + total
+
+            pattern = tuple(sorted(self._pattern_func(winning_numbers[:6])))
+            self._cum_pattern[i + 1] = self._cum_pattern[i]
+            self._cum_pattern[i + 1, self._pattern_lookup[pattern]] += 1
+
+            self.last_seen[numbers] = round_num
+            self.rounds[i] = round_num
+            self.size = i + 1  # 행을 다 채운 뒤 공개 (읽기 쪽은 size까지만 사용)
+            return True
+
+    def _grow(self):
+        capacity = len(self.rounds) * 2
+        self.rounds = _resized(self.rounds, capacity)
+        self._cum = _resized(self._cum, capacity + 1)
+        self._cum_odd = _resized(self._cum_odd, capacity + 1)
+        self._cum_sum = _resized(self._cum_sum, capacity + 1)
+        self._cum_total = _resized(self._cum_total, capacity + 1)
+        self._cum_pattern = _resized(self._cum_pattern, capacity + 1)
+
+    def window(self, from_round=None, to_round=None, last=None):
+        """
+        회차 구간을 누적 배열 위치 [start, end)로 바꿉니다.
+        last가 있으면 to_round(기본 최신 회차)까지의 최근 last개 회차입니다.
+        """
+        rounds = self.rounds[:self.size]
+        end = self.size if to_round is None else int(np.searchsorted(rounds, to_round, side="right"))
+        if last is not None:
+            start = max(0, end - last)
+        elif from_round is not None:
+            start = int(np.searchsorted(rounds, from_round, side="left"))
+        else:
+            start = 0
+        return start, max(start, end)
+
+    def summary(self, start, end, top=6):
+        """구간 [start, end)의 번호별 빈도, 핫/콜드 번호, 홀짝/합계/번호군 패턴 분포"""
+        if end <= start:
+            raise ValueError("해당 구간에 회차가 없습니다.")
+        counts = (self._cum[end] - self._cum[start])[1:]
+        order = np.argsort(-counts, kind="stable")  # 빈도 내림차순, 같은 빈도는 번호 오름차순
+        cold_order = np.argsort(counts, kind="stable")
+        rounds = int(end - start)
+
+        odd_even = self._cum_odd[end] - self._cum_odd[start]
+        sums = self._cum_sum[end] - self._cum_sum[start]
+        pattern_counts = self._cum_pattern[end] - self._cum_pattern[start]
+        pattern_order = np.argsort(-pattern_counts, kind="stable")
+
+        last_round = self.last_round
+        return {
+            "from_round": int(self.rounds[start]),
+            "to_round": int(self.rounds[end - 1]),
+            "rounds": rounds,
+            "frequency": {int(n): int(c) for n, c in zip(range(1, MAX_NUMBER + 1), counts)},
+            "hot": [{"number": int(i) + 1, "count": int(counts[i])} for i in order[:top]],
+            "cold": [{"number": int(i) + 1, "count": int(counts[i])} for i in cold_order[:top]],
+            # 최신 회차 기준, 마지막 당첨 이후 지난 회차 수 (당첨 이력이 없으면 None)
+            "gaps": {n: (last_round - int(self.last_seen[n]) if self.last_seen[n] else None)
+                     for n in range(1, MAX_NUMBER + 1)},
+            "odd_even": {f"{odd}:{6 - odd}": int(c) for odd, c in enumerate(odd_even)},
+            "sum": {
+                "mean": round(float(self._cum_total[end] - self._cum_total[start]) / rounds, 2),
+                "buckets": [
+                    {"range": [b * SUM_BUCKET, (b + 1) * SUM_BUCKET - 1], "count": int(c)}
+                    for b, c in enumerate(sums) if c
+                ],
+            },
+            "group_patterns": [
+                {"pattern": list(PATTERNS[i]), "count": int(pattern_counts[i])}
+                for i in pattern_order if pattern_counts[i]
+            ],
+        }
+
+def _resized(array, length):
+    resized = np.zeros((length,) + array.shape[1:], dtype=array.dtype)
+    resized[:len(array)] = array
+    return resized
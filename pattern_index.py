@@ -0,0 +1,128 @@
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+
+MAX_ORDER = 4
+EQUIVALENCES = ("multiset", "counts")
+
+def encode_pattern(pattern, equivalence="multiset"):
+    """
+    패턴 동치 키.
+      multiset: 번호군을 정렬한 목록 (예: [1, 2, 2, 4, 4, 4])
+      counts:   번호군별 개수를 내림차순 정렬한 개수 벡터, 어느 번호군인지는 무시 (예: (3, 2, 1))
+    """
+    if equivalence == "multiset":
+        return tuple(sorted(pattern))
+    if equivalence == "counts":
+        return tuple(sorted(Counter(pattern).values(), reverse=True))
+    raise ValueError(f"지원하지 않는 패턴 동치 방식입니다: {equivalence}")
+
+class PatternTransitionIndex:
+    """
+    번호군 패턴 n-gram 인덱스: (차수, 직전 k개 회차 패턴 키) -> 다음 회차 패턴 분포
+    동치 방식마다 차수 0(전체 분포) ~ max_order의 키를 해시 색인하고,
+    키별로 대상 회차 목록(정렬)과 다음 패턴 Counter를 유지합니다.
+    로드 시 한 번 구성하고, 새 회차는 append_round()로 증분 반영합니다. (과거 회차가 나중에 들어와도 됨)
+    """
+
+    def __init__(self, pattern_func, max_order=MAX_ORDER):
+        self._pattern_func = pattern_func
+        self.max_order = max_order
+        self._lock = threading.Lock()
+        self.numbers_by_round = {}
+        self.pattern_by_round = {}
+        self._ids = {}  # (동치 방식, 패턴 키) -> 정수 id, n-gram 키를 짧은 정수 튜플로 유지
+        self.targets = {eq: {} for eq in EQUIVALENCES}  # 동치 방식 -> {n-gram 키: [대상 회차]}
+        self.next_counts = {eq: {} for eq in EQUIVALENCES}  # 동치 방식 -> {n-gram 키: Counter(다음 패턴)}
+
+    @property
+    def last_round(self):
+        return max(self.pattern_by_round, default=0)
+
+    def load(self, historical_data):
+        for item in sorted(historical_data, key=lambda x: x["round"]):
+            self.append_round(item["round"], item["winning_numbers"])
+        return self
+
+    def append_round(self, round_num, winning_numbers):
+        with self._lock:
+            if round_num in self.numbers_by_round:
+                return False
+            self.numbers_by_round[round_num] = list(winning_numbers)
+            self.pattern_by_round[round_num] = tuple(self._pattern_func(winning_numbers))
+            # 이 회차로 처음 완성되는 (대상 회차, 차수) 항목만 추가
+            for target in range(round_num, round_num + self.max_order + 1):
+                if target not in self.pattern_by_round:
+                    continue
+                for order in range(max(0, target - round_num), self.max_order + 1):
+                    history = [self.pattern_by_round.get(r) for r in range(target - order, target)]
+                    if None not in history:
+                        self._add_locked(target, history)
+            return True
+
+    def _add_locked(self, target, history):
+        next_pattern = self.pattern_by_round[target]
+        for eq in EQUIVALENCES:
+            key = self._key(history, eq, create=True)
+            insort(self.targets[eq].setdefault(key, []), target)
+            self.next_counts[eq].setdefault(key, Counter())[next_pattern] += 1
+
+    def _key(self, history, equivalence, create=False):
+        ids = [len(history)]
+        for pattern in history:
+            code = (equivalence, encode_pattern(pattern, equivalence))
+            pattern_id = self._ids.get(code)
+            if pattern_id is None:
+                if not create:
+                    return None
+                pattern_id = self._ids[code] = len(self._ids)
+            ids.append(pattern_id)
+        return tuple(ids)
+
+    def history(self, round_num, order):
+        """round_num까지 연속된 최근 order개 회차 패턴 (오래된 순, 빠진 회차에서 중단)"""
+        patterns = []
+        for r in range(round_num, round_num - order, -1):
+            pattern = self.pattern_by_round.get(r)
+            if pattern is None:
+                break
+            patterns.append(list(pattern))
+        return patterns[::-1]
+
+    def query(self, history, order=1, equivalence="multiset", window=None, min_support=1, k=3,
+              fallback=True, latest_round=None):
+        """
+        직전 패턴 history(오래된 순)의 마지막 order개와 같은 이력 다음에 나온 패턴을 빈도 순으로 k개 반환합니다.
+        표본 수(support)가 min_support보다 적으면 차수를 낮춰 재조회하며(fallback), 차수 0은 전체 패턴 분포입니다.
+        window가 주어지면 대상 회차가 최근 window회 안인 항목만 셉니다.
+        반환: {"order": 사용한 차수, "support": 표본 수, "candidates": [{pattern, count, support, order}]}
+        """
+        if equivalence not in EQUIVALENCES:
+            raise ValueError(f"지원하지 않는 패턴 동치 방식입니다: {equivalence}")
+        order = max(0, min(order, self.max_order, len(history)))
+        cutoff = None
+        if window is not None:
+            cutoff = (latest_round or self.last_round) - window + 1
+        lowest = 0 if fallback else order
+        for current in range(order, lowest - 1, -1):
+            counter = self._counts(history[len(history) - current:], equivalence, cutoff)
+            support = sum(counter.values())
+            if support and (support >= min_support or current == lowest):
+                return {
+                    "order": current,
+                    "support": support,
+                    "candidates": [
+                        {"pattern": list(pattern), "count": count, "support": support, "order": current}
+                        for pattern, count in counter.most_common(k)
+                    ],
+                }
+        return {"order": None, "support": 0, "candidates": []}
+
+    def _counts(self, history, equivalence, cutoff):
+        key = self._key(history, equivalence)
+        if key is None:
+            return Counter()
+        if cutoff is None:
+            return self.next_counts[equivalence].get(key, Counter())
+        targets = self.targets[equivalence].get(key, [])
+        return Counter(self.pattern_by_round[t] for t in targets[bisect_left(targets, cutoff):])
@@ -0,0 +1,78 @@
+import numpy as np
+
+MAX_NUMBER = 45
+PRIZE_KEYS = ("3", "4", "5", "5+bonus", "6")
+CHUNK_SIZE = 4096
+
+def encode_tickets(tickets):
+    """
+    티켓 목록을 (티켓 수 x 46) 0/1 행렬로 변환합니다. (열 인덱스 = 번호)
+    각 티켓은 1~45 사이의 서로 다른 번호 6개여야 합니다.
+    """
+    tickets = np.asarray(tickets, dtype=np.int64)
+    if tickets.ndim != 2 or tickets.shape[1] != 6:
+        raise ValueError("티켓은 번호 6개로 이루어져야 합니다.")
+    if tickets.size and (tickets.min() < 1 or tickets.max() > MAX_NUMBER):
+        raise ValueError("번호는 1 ~ 45 사이여야 합니다.")
+    matrix = np.zeros((len(tickets), MAX_NUMBER + 1), dtype=np.float32)
+    matrix[np.arange(len(tickets))[:, None], tickets] = 1
+    if len(tickets) and (matrix.sum(axis=1) != 6).any():
+        raise ValueError("티켓에 중복된 번호가 있습니다.")
+    return matrix
+
+def encode_draws(draws):
+    """
+    저장소의 (회차 x 7) 배열(당첨 번호 6개 + 보너스)을 당첨 번호 행렬과 보너스 행렬로 변환합니다.
+    빈 슬롯(0)은 제외하고 포함된 회차 번호를 함께 반환합니다.
+    """
+    draws = np.asarray(draws)
+    filled = np.flatnonzero(draws[:, 0])
+    draws = draws[filled].astype(np.intp)
+    rows = np.arange(len(draws))
+    winning = np.zeros((len(draws), MAX_NUMBER + 1), dtype=np.float32)
+    winning[rows[:, None], draws[:, :6]] = 1
+    bonus = np.zeros((len(draws), MAX_NUMBER + 1), dtype=np.float32)
+    bonus[rows, draws[:, 6]] = 1
+    bonus[:, 0] = 0  # 보너스 미상(0)
+    return winning, bonus, filled + 1
+
+def count_prizes(ticket_matrix, winning, bonus):
+    """
+    (티켓 x 회차) 일치 개수를 행렬 곱으로 계산해 티켓별 3/4/5/5+보너스/6개 일치 횟수를 반환합니다.
+    결과는 (티켓 수 x 5) 정수 배열이며 열 순서는 PRIZE_KEYS와 같습니다.
+    """
+    result = np.zeros((len(ticket_matrix), len(PRIZE_KEYS)), dtype=np.int64)
+    winning_t = winning.T
+    bonus_t = bonus.T
+    for start in range(0, len(ticket_matrix), CHUNK_SIZE):
+        chunk = ticket_matrix[start:start + CHUNK_SIZE]
+        matches = chunk @ winning_t
+        five = matches == 5
+        bonus_hit = (chunk @ bonus_t) > 0
+        block = result[start:start + CHUNK_SIZE]
+        block[:, 0] = (matches == 3).sum(axis=1)
+        block[:, 1] = (matches == 4).sum(axis=1)
+        block[:, 2] = (five & ~bonus_hit).sum(axis=1)
+        block[:, 3] = (five & bonus_hit).sum(axis=1)
+        block[:, 4] = (matches == 6).sum(axis=1)
+    return result
+
+def prize_distribution(tickets, winning_numbers, bonus=None):
+    """
+    (티켓 수 x 6) 번호 배열을 한 회차 당첨 번호와 비교해 등수별 티켓 수를 반환합니다.
+    반환: {"none": 미당첨, "3": ..., "4": ..., "5": ..., "5+bonus": ..., "6": ...}
+    """
+    mask = np.zeros(MAX_NUMBER + 1, dtype=bool)
+    mask[list(winning_numbers)] = True
+    matches = mask[tickets].sum(axis=1)
+    five = matches == 5
+    bonus_hit = (tickets == bonus).any(axis=1) if bonus else np.zeros(len(tickets), dtype=bool)
+    counts = {
+        "3": int((matches == 3).sum()),
+        "4": int((matches == 4).sum()),
+        "5": int((five & ~bonus_hit).sum()),
+        "5+bonus": int((five & bonus_hit).sum()),
+        "6": int((matches == 6).sum()),
+    }
+    counts["none"] = len(tickets) - sum(counts.values())
+    return counts
@@ -0,0 +1,169 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from html.parser import HTMLParser
+from urllib.parse import unquote
+
+from lotto_stats import draw_time_of_round
+from refresh import due_round
+
+ROW_LABELS = ("A", "B", "C", "D", "E")
+NUMBER_RE = re.compile(r'^\d{1,2}$')
+TEXT_NUMBER_RE = re.compile(r'\b\d{1,2}\b')
+PENDING_TTL = 60  # 추첨은 끝났지만 결과가 확정되지 않은 회차(또는 회차 불명) 결과의 보관 시간(초)
+
+# -----------------------------
+# 1) QR 페이지 전용 스캐너
+# -----------------------------
+class _QRPageScanner(HTMLParser):
+    """
+    트리를 만들지 않고 태그 이벤트만으로 필요한 부분을 수집합니다.
+      - 모든 <span>의 텍스트 (당첨 번호/보너스)
+      - <th scope="row">가 A~E인 <tr>의 두 번째 <td> 안 <span class="clr"> 번호들
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.span_texts = []
+        self.rows = []
+        self.text_parts = []
+        self._span_stack = []
+        self._skip_depth = 0
+        self._row = None
+        self._in_th = False
+        self._clr_span = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style"):
+            self._skip_depth += 1
+        elif tag == "span":
+            self._span_stack.append([])
+            row = self._row
+            if row is not None and row["td_count"] == 2 and "clr" in (dict(attrs).get("class") or "").split():
+                self._clr_span = len(self._span_stack)
+        elif tag == "tr":
+            self._row = {"label": None, "td_count": 0, "numbers": []}
+        elif tag == "th" and self._row is not None and dict(attrs).get("scope") == "row":
+            self._in_th = True
+            self._row["label"] = ""
+        elif tag == "td" and self._row is not None:
+            self._row["td_count"] += 1
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style"):
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag == "span" and self._span_stack:
+            text = "".join(self._span_stack.pop())
+            self.span_texts.append(text)
+            if self._clr_span is not None and self._clr_span == len(self._span_stack) + 1:
+                if NUMBER_RE.match(text):
+                    self._row["numbers"].append(int(text))
+                self._clr_span = None
+        elif tag == "th":
+            self._in_th = False
+        elif tag == "tr" and self._row is not None:
+            row = self._row
+            if row["label"] in ROW_LABELS and row["td_count"] >= 2:
+                self.rows.append({"row": row["label"], "numbers": row["numbers"]})
+            self._row = None
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        self.text_parts.append(data)
+        stripped = data.strip()
+        if not stripped:
+            return
+        for parts in self._span_stack:
+            parts.append(stripped)
+        if self._in_th:
+            self._row["label"] += stripped
+
+class QRParseError(ValueError):
+    def __init__(self, message, extracted):
+        super().__init__(message)
+        self.extracted = extracted
+
+def parse_qr_html(html):
+    """
+    QR 당첨 확인 페이지에서 당첨 번호, 보너스 번호, A~E 행 번호만 추출합니다.
+    <span> 숫자가 6개 미만이면 페이지 전체 텍스트에서 1~45 숫자를 찾습니다.
+    """
+    scanner = _QRPageScanner()
+    scanner.feed(html)
+    scanner.close()
+
+    numbers = [int(text) for text in scanner.span_texts if NUMBER_RE.match(text)]
+    if len(numbers) < 6:
+        all_text = "".join(scanner.text_parts)
+        numbers = [int(x) for x in TEXT_NUMBER_RE.findall(all_text)]
+        numbers = [n for n in numbers if 1 <= n <= 45]
+    if len(numbers) < 6:
+        raise QRParseError("로또 번호를 추출할 수 없습니다.", numbers)
+
+    return {
+        "registeredNumbers": numbers[:6],
+        "bonus": numbers[6] if len(numbers) > 6 else None,
+        "rowData": scanner.rows
+    }
+
+# -----------------------------
+# 2) 파싱 결과 캐시
+# -----------------------------
+def qr_cache_key(url):
+    """QR URL의 v= 파라미터를 디코딩한 값 (같은 티켓이면 같은 키)"""
+    for sep in ("?v=", "&v="):
+        if sep in url:
+            return unquote(url.split(sep, 1)[1])
+    return None
+
+def ticket_round(key):
+    """v= 값 앞 4자리는 티켓의 회차 번호입니다. 예: 1160q0713... -> 1160"""
+    head = key[:4] if key else ""
+    return int(head) if head.isdigit() else None
+
+class QRResultCache:
+    """
+    v= 파라미터별 파싱 결과의 크기 제한 LRU 캐시.
+    결과가 확정된 회차(추첨 후 REFRESH_DELAY가 지났거나 is_published(회차)가 True)만 만료 없이 보관하고,
+    추첨 전 회차는 추첨 시각까지, 추첨 후 확정 전 회차는 PENDING_TTL초만 보관합니다.
+    """
+
+    def __init__(self, maxsize=2048, is_published=None):
+        self.maxsize = maxsize
+        self.is_published = is_published
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                result, expires_at = entry
+                if expires_at is None or time.time() < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return result
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def _is_final(self, round_num):
+        return round_num <= due_round() or bool(self.is_published and self.is_published(round_num))
+
+    def put(self, key, result):
+        round_num = ticket_round(key)
+        expires_at = None
+        if round_num is None or not self._is_final(round_num):
+            # 추첨 전이면 추첨 시각까지, 추첨 후 결과 발표 전이거나 회차를 알 수 없으면 잠시만 보관
+            now = time.time()
+            draw_time = draw_time_of_round(round_num).timestamp() if round_num else now
+            expires_at = draw_time if draw_time > now else now + PENDING_TTL
+        with self._lock:
+            self._entries[key] = (result, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
@@ -0,0 +1,104 @@
+import fcntl
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from lotto_stats import latest_drawn_round, next_draw_time, KST
+
+REFRESH_DELAY = timedelta(minutes=int(os.environ.get("REFRESH_DELAY_MIN", "10")))  # 추첨 후 첫 갱신까지 대기
+SYNC_INTERVAL = float(os.environ.get("REFRESH_SYNC_SEC", "60"))  # 다른 워커가 저장한 회차 확인 주기
+logger = logging.getLogger("lotto.refresh")
+
+MIN_BACKOFF = 60.0
+MAX_BACKOFF = 30 * 60.0
+
+class SingleFlight:
+    """
+    동시에 들어온 갱신 요청을 하나로 합칩니다.
+    같은 프로세스 안에서는 스레드 잠금으로, 워커 간에는 잠금 파일(flock)로 한 번만 실행합니다.
+    """
+
+    def __init__(self, lock_path):
+        self.lock_path = lock_path
+        self._lock = threading.Lock()
+
+    def run(self, func):
+        """
+        func를 실행하고 (True, 결과)를 반환합니다.
+        다른 워커가 이미 실행 중이면 기다리지 않고 (False, None)을 반환합니다.
+        """
+        with self._lock:
+            with open(self.lock_path, "a") as lock_file:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return False, None
+                try:
+                    return True, func()
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+class RefreshScheduler:
+    """
+    주간 추첨 일정에 맞춰 추첨 REFRESH_DELAY 후 한 번 갱신하고,
+    새 회차가 올라올 때까지 지수 백오프로 재시도합니다.
+      refresh(): 업스트림에서 새 회차를 수집하고 저장소의 최신 회차를 반환
+      sync():    저장소만 읽어 스냅샷을 갱신하고 최신 회차를 반환 (업스트림 호출 없음)
+    """
+
+    def __init__(self, refresh, sync, lock_path):
+        self._refresh = refresh
+        self._sync = sync
+        self.single_flight = SingleFlight(lock_path)
+        self._thread = None
+        self._warned_round = 0  # 뒤처짐 경고를 남긴 회차 (회차마다 한 번만 경고)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="lotto-refresh", daemon=True)
+            self._thread.start()
+
+    def due_round(self, now=None):
+        return due_round(now)
+
+    def refresh_now(self):
+        """단일 실행으로 갱신합니다. 다른 워커가 갱신 중이면 저장소만 다시 읽습니다."""
+        ran, latest_round = self.single_flight.run(self._refresh)
+        if not ran:
+            latest_round = self._sync()
+        return latest_round
+
+    def _run(self):
+        backoff = MIN_BACKOFF
+        while True:
+            try:
+                latest_round = self._sync()
+                if latest_round < self.due_round():
+                    latest_round = self.refresh_now()
+            except Exception as e:
+                logger.exception("백그라운드 갱신 실패: %s", e)
+                latest_round = -1
+
+            due = self.due_round()
+            if latest_round < due:
+                # 아직 새 회차가 올라오지 않음 -> 백오프 후 재시도
+                if self._warned_round != due:
+                    self._warned_round = due
+                    logger.warning("저장소가 최신 회차보다 뒤처져 있습니다. (저장소: %s, 대상: %s) 재시도합니다.",
+                                   latest_round, due)
+                time.sleep(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF)
+                continue
+
+            backoff = MIN_BACKOFF
+            until_next = (next_draw_time() + REFRESH_DELAY - _now()).total_seconds()
+            time.sleep(max(1.0, min(SYNC_INTERVAL, until_next)))
+
+def due_round(now=None):
+    """지금 저장소에 있어야 하는 최신 회차 (추첨 후 REFRESH_DELAY가 지난 회차)"""
+    return latest_drawn_round((now or _now()) - REFRESH_DELAY)
+
+def _now():
+    return datetime.now(KST)
@@ -0,0 +1,152 @@
+import os
+import threading
+
+import numpy as np
+
+MAX_NUMBER = 45
+METHODS = (1, 2, 3, 4)
+MAX_SEED = 2 ** 53 - 1  # 브라우저(JavaScript)에서 정확히 표현되는 최대 정수
+
+GROUP_RANGES = {
+    (1, 10): range(1, 11),
+    (11, 20): range(11, 21),
+    (21, 30): range(21, 31),
+    (31, 40): range(31, 41),
+    (41, 45): range(41, 46),
+}
+
+# 가중치가 0인 번호는 다른 번호가 모두 소진된 경우에만 선택되도록 매우 작은 로그 가중치를 부여
+_ZERO_WEIGHT_LOG = -1e9
+BATCH_CHUNK_SIZE = 10000
+
+def parse_group_keys(selected_groups):
+    """
+    selected_groups([[1, 10], [21, 30]] 등)를 GROUP_RANGES 키 목록으로 변환합니다.
+    중복 및 정의되지 않은 그룹은 무시하고, [시작, 끝] 쌍이 아닌 항목은 ValueError를 발생시킵니다.
+    """
+    if not isinstance(selected_groups, (list, tuple)):
+        raise ValueError("selected_groups는 [시작, 끝] 쌍의 목록이어야 합니다.")
+    keys = []
+    for group in selected_groups:
+        try:
+            start, end = group
+            key = (int(start), int(end))
+        except (TypeError, ValueError):
+            raise ValueError("selected_groups는 [시작, 끝] 쌍의 목록이어야 합니다.") from None
+        if key in GROUP_RANGES and key not in keys:
+            keys.append(key)
+    return keys
+
+def check_group_size(group_keys, n=6):
+    """선택한 번호군(parse_group_keys() 결과)의 번호가 n개 미만이면 ValueError를 발생시킵니다."""
+    if sum(len(GROUP_RANGES[key]) for key in group_keys) < n:
+        raise ValueError(f"선택한 번호군의 번호가 {n}개 이상이어야 합니다.")
+
+def build_group_masks(selected_groups):
+    """
+    selected_groups([[1, 10], [21, 30]] 등)를 번호 인덱스(0~45) 불리언 마스크로 변환합니다.
+    중복 및 정의되지 않은 그룹은 무시합니다.
+    """
+    group_masks = []
+    for key in parse_group_keys(selected_groups):
+        mask = np.zeros(MAX_NUMBER + 1, dtype=bool)
+        mask[list(GROUP_RANGES[key])] = True
+        group_masks.append(mask)
+    if not group_masks:
+        return np.zeros((0, MAX_NUMBER + 1), dtype=bool)
+    return np.vstack(group_masks)
+
+_root_lock = threading.Lock()
+_root = None  # (pid, SeedSequence): fork된 워커가 마스터와 같은 난수열을 쓰지 않도록 pid별로 생성
+_local = threading.local()
+
+def thread_rng():
+    """
+    현재 스레드 전용 Generator. 프로세스마다 새 엔트로피로 만든 SeedSequence에서 스레드별 스트림을 spawn하므로
+    전역 np.random/random 상태와 달리 스레드 간 잠금 경합이 없습니다.
+    """
+    pid = os.getpid()
+    if getattr(_local, "pid", None) != pid:
+        global _root
+        with _root_lock:
+            if _root is None or _root[0] != pid:
+                _root = (pid, np.random.SeedSequence())
+            seed_seq = _root[1].spawn(1)[0]
+        _local.rng = np.random.default_rng(seed_seq)
+        _local.pid = pid
+    return _local.rng
+
+def request_rng(seed=None):
+    """
+    요청 하나에 쓸 (Generator, seed). seed가 없으면 스레드 스트림에서 새로 뽑으며,
+    같은 seed와 같은 데이터(회차)로 다시 요청하면 같은 결과가 나옵니다.
+    """
+    if seed is None:
+        seed = int(thread_rng().integers(0, MAX_SEED, endpoint=True))
+    return np.random.default_rng(seed), seed
+
+def method_weights(probability_array, method_choice):
+    """
+    method 1(가중), 2(균등), 3(역가중), 4(조건부, 기본 가중치는 1과 같음)에 대응하는 번호별 가중치 (인덱스 = 번호)
+    """
+    probability_array = np.asarray(probability_array, dtype=np.float64)
+    if method_choice in (1, 4):
+        weights = probability_array.copy()
+    elif method_choice == 2:
+        weights = np.ones(MAX_NUMBER + 1, dtype=np.float64)
+    else:
+        weights = np.zeros(MAX_NUMBER + 1, dtype=np.float64)
+        positive = probability_array > 0
+        weights[positive] = 1 / probability_array[positive]
+    weights[0] = 0
+    return weights
+
+def method_log_weights(probability_array, method_choice):
+    """method_weights()의 로그 (가중치 0은 매우 작은 값)"""
+    weights = method_weights(probability_array, method_choice)
+    log_weights = np.full(MAX_NUMBER + 1, _ZERO_WEIGHT_LOG, dtype=np.float64)
+    positive = weights > 0
+    log_weights[positive] = np.log(weights[positive])
+    return log_weights
+
+def _draw_chunk(group_masks, available, log_weights, count, n, rng):
+    rows = np.arange(count)
+    chosen = np.zeros((count, MAX_NUMBER + 1), dtype=bool)
+
+    # (1) 그룹별 필수 번호: 그룹 내부에서 Gumbel-max로 1개씩
+    for mask in group_masks:
+        keys = np.where(mask, log_weights, -np.inf) + rng.gumbel(size=(count, MAX_NUMBER + 1))
+        chosen[rows, keys.argmax(axis=1)] = True
+
+    # (2) 나머지 번호: 남은 후보 전체에서 Gumbel-top-k (비복원 가중 추출과 동일한 분포)
+    rest = n - len(group_masks)
+    if rest > 0:
+        eligible = available & ~chosen
+        keys = np.where(eligible, log_weights, -np.inf) + rng.gumbel(size=(count, MAX_NUMBER + 1))
+        top = np.argpartition(-keys, rest - 1, axis=1)[:, :rest]
+        chosen[rows[:, None], top] = True
+
+    per_ticket = int(chosen[0].sum())
+    return np.nonzero(chosen)[1].reshape(count, per_ticket)
+
+def generate_ticket_batch(selected_groups, probability_array, method_choice, count, n=6, rng=None, log_weights=None):
+    """
+    select_numbers_from_groups()를 count장 한 번에 수행하는 벡터화 버전.
+    각 티켓은 선택된 그룹마다 최소 1개의 번호를 포함하며, (count, n) 정렬 배열을 반환합니다.
+    log_weights가 주어지면 probability_array 대신 미리 계산한 로그 가중치를 사용합니다.
+    """
+    rng = rng or thread_rng()
+    group_keys = parse_group_keys(selected_groups)
+    if not group_keys:
+        raise ValueError("선택된 번호군이 없습니다.")
+    check_group_size(group_keys, n)
+    group_masks = build_group_masks(group_keys)
+    available = group_masks.any(axis=0)
+    if log_weights is None:
+        log_weights = method_log_weights(probability_array, method_choice)
+
+    chunks = []
+    for start in range(0, count, BATCH_CHUNK_SIZE):
+        size = min(BATCH_CHUNK_SIZE, count - start)
+        chunks.append(_draw_chunk(group_masks, available, log_weights, size, n, rng))
+    return np.vstack(chunks)
@@ -0,0 +1,213 @@
+import logging
+import os
+import random
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from instrumentation import metrics
+
+POOL_MAXSIZE = int(os.environ.get("UPSTREAM_POOL_MAXSIZE", "16"))
+RATE_PER_SEC = float(os.environ.get("UPSTREAM_RATE_PER_SEC", "5"))  # 호스트당 초당 최대 요청 수
+QR_RATE_PER_SEC = float(os.environ.get("UPSTREAM_QR_RATE_PER_SEC", "20"))  # QR 당첨 확인(winQr) 페이지 전용 한도
+UPSTREAM_OVERRIDE = os.environ.get("UPSTREAM_OVERRIDE")  # 예: http://127.0.0.1:8765 (벤치마크용 로컬 스텁 서버)
+CONNECT_TIMEOUT = float(os.environ.get("UPSTREAM_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.environ.get("UPSTREAM_READ_TIMEOUT", "10"))
+RETRIES = int(os.environ.get("UPSTREAM_RETRIES", "2"))  # 연결 실패/타임아웃/5xx 재시도 횟수
+RETRY_BACKOFF = 0.3  # 재시도 대기 상한(초) = RETRY_BACKOFF * 2^시도 (full jitter)
+BREAKER_THRESHOLD = int(os.environ.get("UPSTREAM_BREAKER_THRESHOLD", "5"))  # 연속 실패 시 회로 차단
+BREAKER_RESET_SEC = float(os.environ.get("UPSTREAM_BREAKER_RESET_SEC", "30"))  # 차단 후 시험 요청까지 대기
+RETRY_STATUS = (429, 500, 502, 503, 504)
+logger = logging.getLogger("lotto.upstream")
+
+# -----------------------------
+# 1) keep-alive 세션 풀
+# -----------------------------
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """
+    프로세스 전체에서 공유하는 keep-alive 세션.
+    매 요청마다 TCP/TLS 연결을 새로 맺지 않도록 호스트별 연결 풀을 재사용합니다.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_MAXSIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+# -----------------------------
+# 2) 호스트별 요청 속도 제한
+# -----------------------------
+class HostRateLimiter:
+    """호스트마다 요청 간 최소 간격(1 / rate_per_sec)을 보장합니다."""
+
+    def __init__(self, rate_per_sec):
+        self.interval = 1.0 / rate_per_sec if rate_per_sec > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = {}
+
+    def wait(self, host):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+rate_limiter = HostRateLimiter(RATE_PER_SEC)
+# 사용자 요청으로 들어오는 QR 조회는 회차 수집과 한도를 나눠, 일괄 조회가 수집 한도(5/초)에 묶이지 않게 함
+qr_rate_limiter = HostRateLimiter(QR_RATE_PER_SEC)
+
+def _apply_override(url):
+    """UPSTREAM_OVERRIDE가 설정되면 모든 dhlottery 호스트를 해당 주소로 보냅니다. (경로/쿼리는 유지)"""
+    if not UPSTREAM_OVERRIDE:
+        return url
+    target = urlsplit(UPSTREAM_OVERRIDE)
+    parts = urlsplit(url)
+    return urlunsplit((target.scheme, target.netloc, parts.path, parts.query, parts.fragment))
+
+def upstream_target(url):
+    """메트릭 라벨용 대상 페이지 이름: statByNumber, byWin, byWinRound, winQr, other"""
+    query = parse_qs(urlsplit(url).query)
+    method = (query.get("method") or ["other"])[0]
+    if method == "byWin" and "drwNo" in query:
+        return "byWinRound"
+    return method if method in ("statByNumber", "byWin", "winQr") else "other"
+
+# -----------------------------
+# 3) 대상 페이지별 회로 차단기
+# -----------------------------
+class UpstreamUnavailable(requests.RequestException):
+    """회로가 열려 있어 업스트림에 요청을 보내지 않았습니다."""
+
+class CircuitBreaker:
+    """
+    연속 실패가 threshold번이면 회로를 열고 reset_sec 동안 요청을 바로 거절합니다.
+    그 뒤 시험 요청 하나만 보내(half-open) 성공하면 닫고, 실패하면 다시 엽니다.
+    """
+
+    def __init__(self, threshold, reset_sec):
+        self.threshold = threshold
+        self.reset_sec = reset_sec
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial = False
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_sec:
+                return "half_open"
+            return "open"
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial or time.monotonic() - self._opened_at < self.reset_sec:
+                return False
+            self._trial = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial or self._failures >= self.threshold:
+                self._opened_at = time.monotonic()
+            self._trial = False
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def get_breaker(target):
+    with _breakers_lock:
+        breaker = _breakers.get(target)
+        if breaker is None:
+            breaker = _breakers[target] = CircuitBreaker(BREAKER_THRESHOLD, BREAKER_RESET_SEC)
+        return breaker
+
+def breaker_states():
+    """{대상 페이지: closed | open | half_open}"""
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {target: breaker.state for target, breaker in breakers.items()}
+
+# -----------------------------
+# 4) GET 요청 (타임아웃, 재시도)
+# -----------------------------
+def _retryable(error):
+    if isinstance(error, requests.HTTPError):
+        return error.response is not None and error.response.status_code in RETRY_STATUS
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+def _send(url, target, kwargs):
+    """재시도를 포함한 한 번의 논리적 요청. 재시도할 수 없는 오류나 마지막 오류를 그대로 올립니다."""
+    host = urlsplit(url).hostname
+    limiter = qr_rate_limiter if target == "winQr" else rate_limiter
+    for attempt in range(RETRIES + 1):
+        limiter.wait(host)
+        metrics.inc("lotto_upstream_requests_total", {"target": target})
+        started = time.perf_counter()
+        try:
+            response = get_session().get(url, **kwargs)
+            response.raise_for_status()
+            error = None
+        except requests.RequestException as e:
+            error = e
+        metrics.observe("lotto_stage_duration_seconds", time.perf_counter() - started, {"stage": "upstream_fetch"})
+        if error is None:
+            return response
+
+        metrics.inc("lotto_upstream_errors_total", {"target": target})
+        if attempt >= RETRIES or not _retryable(error):
+            raise error
+        delay = random.uniform(0, RETRY_BACKOFF * 2 ** attempt)
+        logger.warning("업스트림 %s 요청 실패, %.2f초 후 재시도 (%d/%d): %s", target, delay, attempt + 1, RETRIES, error)
+        metrics.inc("lotto_upstream_retries_total", {"target": target})
+        time.sleep(delay)
+
+def http_get(url, **kwargs):
+    """
+    속도 제한을 거쳐 공유 세션으로 GET 요청을 보냅니다.
+    연결/읽기 타임아웃과 지터 재시도를 적용하고, 대상 페이지의 회로가 열려 있으면 UpstreamUnavailable을 올립니다.
+    업스트림 장애 중의 응답은 요청 경로가 아니라 메모리 스냅샷(stale 표시)으로 처리합니다.
+    """
+    target = upstream_target(url)
+    url = _apply_override(url)
+    kwargs.setdefault("timeout", (CONNECT_TIMEOUT, READ_TIMEOUT))
+    breaker = get_breaker(target)
+    if not breaker.allow():
+        metrics.inc("lotto_upstream_short_circuits_total", {"target": target})
+        raise UpstreamUnavailable(f"업스트림 {target} 회로가 열려 있습니다.")
+    try:
+        response = _send(url, target, kwargs)
+    except requests.RequestException as e:
+        if _retryable(e):
+            breaker.record_failure()
+        else:
+            breaker.record_success()  # 4xx는 업스트림 장애가 아님
+        raise
+    breaker.record_success()
+    return response
@@ -0,0 +1,115 @@
+import time
+from itertools import combinations, permutations
+from math import comb, factorial
+
+import numpy as np
+
+MAX_NUMBER = 45
+PICK = 6
+_PAIR_SLOTS = np.array(list(permutations(range(PICK), 2)), dtype=np.intp)    # 30 = 15쌍 x 2 방향
+_TRIPLE_SLOTS = np.array(list(permutations(range(PICK), 3)), dtype=np.intp)  # 120 = 20조합 x 6 순서
+
+class WheelBuilder:
+    """
+    티켓 묶음이 universe 안의 k개 번호 조합(k = 2: 번호쌍, 3: 삼중 조합)을 최대한 많이 덮도록 만듭니다.
+      counts  k개 조합별로 덮은 티켓 수 (대칭 배열, 46^k)
+      tickets 티켓별 번호 비트마스크 (비트 n = 번호 n)
+    1) 탐욕 구성: 티켓마다 아직 덮이지 않은 조합을 가장 많이 늘리는 번호를 하나씩 추가
+    2) 지역 탐색: 시간 예산 안에서 티켓 하나를 빼고 다시 탐욕 구성해, 덮은 수가 줄지 않으면 교체
+    """
+
+    def __init__(self, universe, k=2, rng=None):
+        self.universe = np.zeros(MAX_NUMBER + 1, dtype=bool)
+        self.universe[list(universe)] = True
+        self.k = k
+        self.rng = rng or np.random.default_rng()
+        self.counts = np.zeros((MAX_NUMBER + 1,) * k, dtype=np.int32)
+        self._slots = _PAIR_SLOTS if k == 2 else _TRIPLE_SLOTS
+        self._valid = self.universe
+        for _ in range(k - 1):
+            self._valid = np.logical_and.outer(self._valid, self.universe)  # universe 안의 항목
+        self.tickets = []
+        self.covered = 0  # 한 번 이상 덮인 k개 조합 수
+
+    @property
+    def target(self):
+        return comb(int(self.universe.sum()), self.k)
+
+    def _update(self, numbers, delta):
+        index = tuple(numbers[self._slots].T)
+        before = self.counts[index] > 0
+        self.counts[index] += delta
+        after = self.counts[index] > 0
+        # 순서만 다른 항목이 k!개씩 있으므로 나눠서 조합 수로 환산
+        self.covered += (int(after.sum()) - int(before.sum())) // factorial(self.k)
+
+    def _gains(self, chosen):
+        """chosen에 번호를 하나 더할 때 새로 덮이는 조합 수 (인덱스 = 번호)"""
+        if not chosen:
+            # 첫 번호: 덮이지 않은 조합에 가장 많이 속한 번호
+            uncovered = (self.counts == 0) & self._valid
+            gains = uncovered.reshape(MAX_NUMBER + 1, -1).sum(axis=1).astype(np.float64)
+        elif self.k == 2:
+            gains = (self.counts[chosen] == 0).sum(axis=0).astype(np.float64)
+        elif len(chosen) == 1:
+            # 삼중 조합의 두 번째 번호: 첫 번호와 함께 덮이지 않은 조합이 많은 번호
+            uncovered = (self.counts[chosen[0]] == 0) & self._valid[chosen[0]]
+            gains = uncovered.sum(axis=0).astype(np.float64)
+        else:
+            a, b = np.array(list(combinations(chosen, 2))).T
+            gains = (self.counts[a, b] == 0).sum(axis=0).astype(np.float64)
+        gains[~self.universe] = -1
+        gains[chosen] = -1
+        return gains
+
+    def _greedy_ticket(self):
+        chosen = []
+        while len(chosen) < PICK:
+            # 0.5 미만의 난수로 같은 이득 사이에서만 무작위 선택
+            gains = self._gains(chosen) + self.rng.random(MAX_NUMBER + 1) * 0.5
+            chosen.append(int(np.argmax(gains)))
+        return np.array(sorted(chosen), dtype=np.intp)
+
+    def add(self, numbers):
+        self._update(numbers, 1)
+        self.tickets.append(_to_mask(numbers))
+
+    def build(self, count, time_budget=0.2):
+        started = time.perf_counter()
+        for _ in range(count):
+            self.add(self._greedy_ticket())
+        iterations = improved = 0
+        while time.perf_counter() - started < time_budget and self.covered < self.target:
+            i = int(self.rng.integers(len(self.tickets)))
+            old = _from_mask(self.tickets[i])
+            before = self.covered
+            self._update(old, -1)
+            new = self._greedy_ticket()
+            self._update(new, 1)
+            if self.covered >= before:
+                improved += self.covered > before
+                self.tickets[i] = _to_mask(new)
+            else:
+                self._update(new, -1)
+                self._update(old, 1)
+            iterations += 1
+        return {"iterations": iterations, "improvements": improved,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 3)}
+
+    def ticket_list(self):
+        return [_from_mask(mask).tolist() for mask in self.tickets]
+
+def coverage(tickets, universe, k):
+    """티켓 묶음이 universe의 k개 번호 조합 중 몇 개를 덮는지 (조합을 비트마스크로 모아 계산)"""
+    covered = {_to_mask(sub) for ticket in tickets for sub in combinations(sorted(ticket), k)}
+    total = comb(len(set(universe)), k)
+    return {"covered": len(covered), "total": total, "ratio": round(len(covered) / total, 4) if total else 0.0}
+
+def _to_mask(numbers):
+    mask = 0
+    for n in numbers:
+        mask |= 1 << int(n)
+    return mask
+
+def _from_mask(mask):
+    return np.array([n for n in range(1, MAX_NUMBER + 1) if mask >> n & 1], dtype=np.intp)